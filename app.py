@@ -1,3 +1,4 @@
+import time
 from flask import Flask, request
 from flask_restful import Api
 from flask_jwt_extended import JWTManager
@@ -6,6 +7,7 @@ from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_bcrypt import Bcrypt
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 from backend.config import Config
 
@@ -20,13 +22,19 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Client address and scheme from the trusted proxies' X-Forwarded-* headers
+    hops = app.config['PROXY_FIX_HOPS']
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     bcrypt.init_app(app)
     jwt.init_app(app)
     CORS(app)
-    socketio.init_app(app, cors_allowed_origins="*")
+    # With Redis, emits from any worker (or a CLI command) reach sockets on every node
+    socketio.init_app(app, cors_allowed_origins="*", message_queue=app.config['REDIS_URL'])
     
     # Register blueprints
     from backend.routes.auth import auth_bp
@@ -37,6 +45,7 @@ def create_app(config_class=Config):
     from backend.routes.settings import settings_bp
     from backend.routes.payments import payments_bp
     from backend.routes.rewards import rewards_bp
+    from backend.routes.candidates import candidates_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(jobs_bp)
@@ -46,6 +55,39 @@ def create_app(config_class=Config):
     app.register_blueprint(settings_bp, url_prefix='/settings')
     app.register_blueprint(payments_bp, url_prefix='/payments')
     app.register_blueprint(rewards_bp, url_prefix='/rewards')
+    app.register_blueprint(candidates_bp, url_prefix='/candidates')
+    
+    # Reject revoked tokens (logout, password change, account deletion)
+    from backend.services.revocation_service import is_token_revoked
+    
+    @jwt.token_in_blocklist_loader
+    def check_token_revoked(_jwt_header, jwt_payload):
+        return is_token_revoked(jwt_payload)
+    
+    # Sub-second issue time, so a password change's cutoff can tell tokens
+    # issued just before it from the one it hands out right after
+    @jwt.additional_claims_loader
+    def add_issued_at(identity):
+        return {"issued_at": time.time()}
+    
+    @jwt.revoked_token_loader
+    def token_revoked(_jwt_header, jwt_payload):
+        return {"status": "error", "message": "Token has been revoked"}, 401
+    
+    # current_user for @jwt_required views, via the cross-request user cache
+    from backend.services.user_cache_service import load_user
+    
+    @jwt.user_lookup_loader
+    def load_current_user(_jwt_header, jwt_data):
+        return load_user(jwt_data['sub'])
+    
+    @jwt.user_lookup_error_loader
+    def current_user_not_found(_jwt_header, jwt_data):
+        return {"status": "error", "message": "User not found"}, 404
+    
+    # Maintenance commands (flask <group> <command>)
+    from backend.commands import register_commands
+    register_commands(app)
     
     # Error handlers
     @app.errorhandler(404)
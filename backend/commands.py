@@ -0,0 +1,265 @@
+import click
+from flask.cli import AppGroup
+
+messages_cli = AppGroup('messages', help='Chat history maintenance')
+notifications_cli = AppGroup('notifications', help='Notification maintenance')
+users_cli = AppGroup('users', help='User maintenance')
+candidates_cli = AppGroup('candidates', help='Candidate search index')
+uploads_cli = AppGroup('uploads', help='Uploaded file maintenance')
+skills_cli = AppGroup('skills', help='Skill taxonomy')
+credentials_cli = AppGroup('credentials', help='Credential maintenance')
+tokens_cli = AppGroup('tokens', help='Access token maintenance')
+rewards_cli = AppGroup('rewards', help='Reward points and leaderboards')
+
+@messages_cli.command('archive')
+@click.option('--days', type=int, default=None, help='Archive messages older than this many days')
+@click.option('--segment-size', type=int, default=None, help='Messages per compressed segment')
+def archive_messages(days, segment_size):
+    """Move old messages into compressed archive segments"""
+    from backend.services.archive_service import archive_old_messages
+    
+    result = archive_old_messages(older_than_days=days, segment_size=segment_size)
+    click.echo(f"Archived {result['messages']} messages into {result['segments']} segments")
+
+@notifications_cli.command('purge')
+@click.option('--dry-run', is_flag=True, help='Only report how many rows each policy would remove')
+@click.option('--batch-size', type=int, default=None, help='Rows deleted per transaction')
+def purge_notifications(dry_run, batch_size):
+    """Apply the notification retention policies (run periodically, e.g. from cron)"""
+    from backend.services.retention_service import notification_retention_report, purge_notifications
+    
+    if dry_run:
+        report = notification_retention_report()
+    else:
+        report = purge_notifications(batch_size=batch_size)
+    
+    verb = "would remove" if dry_run else "removed"
+    for entry in report:
+        click.echo(f"{entry['policy']}: {verb} {entry['count']}")
+
+@users_cli.command('sync-preference-masks')
+@click.option('--batch-size', type=int, default=1000)
+def sync_preference_masks(batch_size):
+    """Recompute notification_preference_mask from the stored preferences"""
+    from app import db
+    from backend.models.user import User, notification_preference_mask
+    
+    updated = 0
+    last_id = 0
+    while True:
+        users = User.query.filter(User.id > last_id).order_by(User.id).limit(batch_size).all()
+        if not users:
+            break
+        
+        for user in users:
+            mask = notification_preference_mask(user.notification_preferences)
+            if user.notification_preference_mask != mask:
+                user.notification_preference_mask = mask
+                updated += 1
+        
+        db.session.commit()
+        last_id = users[-1].id
+    
+    click.echo(f"Updated {updated} users")
+
+@candidates_cli.command('reindex')
+@click.option('--batch-size', type=int, default=100)
+def reindex_candidates(batch_size):
+    """Extract and index every user's current resume (initial backfill)"""
+    from app import db
+    from backend.models.user import User
+    from backend.services.resume_service import analyze_resume, index_resume, SKILL_TERMS
+    from backend.services.storage_service import get_storage, storage_key, RESUMES
+    
+    storage = get_storage()
+    indexed = 0
+    last_id = 0
+    while True:
+        users = User.query.filter(User.id > last_id, User.resume_url != None)\
+            .order_by(User.id).limit(batch_size).all()
+        if not users:
+            break
+        
+        for user in users:
+            key = storage_key(RESUMES, user.resume_url)
+            if not storage.exists(key):
+                continue
+            
+            with storage.open(key) as resume:
+                extension = user.resume_url.rsplit('.', 1)[-1].lower()
+                text, terms = analyze_resume(resume.read(), extension, SKILL_TERMS)
+            index_resume(user.id, user.resume_url, text, terms)
+            indexed += 1
+        
+        db.session.commit()
+        last_id = users[-1].id
+    
+    click.echo(f"Indexed {indexed} resumes")
+
+@candidates_cli.command('reindex-availability')
+@click.option('--batch-size', type=int, default=1000)
+def reindex_availability(batch_size):
+    """Recompute the 15-minute slot masks of every schedule row"""
+    from app import db
+    from backend.models.schedule import Schedule
+    
+    updated = 0
+    last_id = 0
+    while True:
+        schedules = Schedule.query.filter(Schedule.id > last_id).order_by(Schedule.id).limit(batch_size).all()
+        if not schedules:
+            break
+        
+        for schedule in schedules:
+            schedule.set_hours(schedule.start_time, schedule.end_time)
+            updated += 1
+        
+        db.session.commit()
+        last_id = schedules[-1].id
+    
+    click.echo(f"Reindexed {updated} schedules")
+
+@uploads_cli.command('gc')
+@click.option('--dry-run', is_flag=True, help='Only report how many blobs would be removed')
+@click.option('--recount', is_flag=True, help='Rebuild reference counts from User/Credential rows first')
+def collect_garbage(dry_run, recount):
+    """Delete uploaded files that no user or credential references any more"""
+    from backend.services.storage_service import collect_upload_garbage
+    
+    removed = collect_upload_garbage(dry_run=dry_run, recount=recount)
+    verb = "Would remove" if dry_run else "Removed"
+    click.echo(f"{verb} {removed} unreferenced files")
+
+@skills_cli.command('migrate')
+@click.option('--batch-size', type=int, default=500)
+def migrate_skills(batch_size):
+    """Build the normalized skill index from users' comma-separated skills"""
+    from app import db
+    from backend.models.skill import Skill, SkillAlias
+    from backend.models.user import User
+    from backend.services.skill_service import SKILL_ALIASES, get_or_create_skill, set_user_skills
+    
+    # Seed the built-in aliases so they can be managed in the database
+    for alias, name in SKILL_ALIASES.items():
+        if SkillAlias.query.get(alias) is None:
+            skill = get_or_create_skill(name)
+            db.session.flush()
+            db.session.add(SkillAlias(alias=alias, skill_id=skill.id))
+    db.session.commit()
+    
+    migrated = 0
+    last_id = 0
+    while True:
+        users = User.query.filter(User.id > last_id, User.skills != None)\
+            .order_by(User.id).limit(batch_size).all()
+        if not users:
+            break
+        
+        for user in users:
+            set_user_skills(user, user.skills)
+            migrated += 1
+        
+        db.session.commit()
+        last_id = users[-1].id
+    
+    click.echo(f"Migrated skills for {migrated} users ({Skill.query.count()} distinct skills)")
+
+@credentials_cli.command('remind-expiring')
+@click.option('--batch-size', type=int, default=None, help='Credentials per transaction')
+def remind_expiring(batch_size):
+    """Send expiry reminders for credentials (run daily, e.g. from cron)"""
+    from backend.services.credential_service import remind_expiring_credentials
+    
+    sent = remind_expiring_credentials(batch_size=batch_size)
+    for days, count in sorted(sent.items()):
+        click.echo(f"{days} days: sent {count} reminders")
+
+@tokens_cli.command('purge-revoked')
+def purge_revoked():
+    """Delete revocation entries for tokens that have expired anyway"""
+    from backend.services.revocation_service import purge_revoked_tokens
+    
+    click.echo(f"Removed {purge_revoked_tokens()} expired revocations")
+
+@rewards_cli.command('rebuild-points')
+@click.option('--batch-size', type=int, default=1000)
+def rebuild_points(batch_size):
+    """Recompute every user's running point total from the Reward table"""
+    from sqlalchemy import func
+    from app import db
+    from backend.models.reward import Reward, UserPoints
+    from backend.models.user import User
+    
+    rebuilt = 0
+    last_id = 0
+    while True:
+        user_ids = [row.id for row in db.session.query(User.id).filter(User.id > last_id)
+                    .order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            break
+        
+        totals = dict.fromkeys(user_ids, (0, 0))
+        totals.update({
+            user_id: (points, entries) for user_id, points, entries in db.session.query(
+                Reward.user_id, func.sum(Reward.points), func.count(Reward.id)
+            ).filter(Reward.user_id.in_(user_ids)).group_by(Reward.user_id)
+        })
+        
+        for user_id, (points, entries) in totals.items():
+            user_points = UserPoints.query.get(user_id) or UserPoints(user_id=user_id)
+            user_points.points = points
+            user_points.entries = entries
+            db.session.add(user_points)
+        
+        db.session.commit()
+        rebuilt += len(user_ids)
+        last_id = user_ids[-1]
+    
+    click.echo(f"Rebuilt points for {rebuilt} users")
+
+@rewards_cli.command('backfill-buckets')
+@click.option('--batch-size', type=int, default=500)
+def backfill_buckets(batch_size):
+    """Rebuild the per-user daily point buckets from the Reward table"""
+    from collections import Counter
+    from sqlalchemy import insert
+    from app import db
+    from backend.models.reward import Reward, RewardBucket
+    from backend.models.user import User
+    
+    buckets = 0
+    last_id = 0
+    while True:
+        user_ids = [row.id for row in db.session.query(User.id).filter(User.id > last_id)
+                    .order_by(User.id).limit(batch_size)]
+        if not user_ids:
+            break
+        
+        totals = Counter()
+        for user_id, created_at, points in db.session.query(Reward.user_id, Reward.created_at, Reward.points)\
+                .filter(Reward.user_id.in_(user_ids), Reward.created_at != None):
+            totals[(created_at.date(), user_id)] += points
+        
+        RewardBucket.query.filter(RewardBucket.user_id.in_(user_ids)).delete(synchronize_session=False)
+        if totals:
+            db.session.execute(insert(RewardBucket), [
+                {"day": day, "user_id": user_id, "points": points}
+                for (day, user_id), points in totals.items()
+            ])
+        
+        db.session.commit()
+        buckets += len(totals)
+        last_id = user_ids[-1]
+    
+    click.echo(f"Wrote {buckets} daily buckets")
+
+def register_commands(app):
+    app.cli.add_command(messages_cli)
+    app.cli.add_command(notifications_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(candidates_cli)
+    app.cli.add_command(uploads_cli)
+    app.cli.add_command(skills_cli)
+    app.cli.add_command(credentials_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(rewards_cli)
@@ -16,18 +16,134 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-dev-key'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     
+    # Revoked tokens are screened by a per-process Bloom filter before the
+    # database is asked; other workers' revocations are picked up every
+    # TOKEN_REVOCATION_SYNC_SECONDS
+    TOKEN_REVOCATION_BLOOM_BITS = 1 << 20
+    TOKEN_REVOCATION_BLOOM_HASHES = 7
+    TOKEN_REVOCATION_SYNC_SECONDS = 5
+    TOKEN_REVOCATION_REBUILD_SECONDS = 3600
+    
     # File uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max upload
     
-    # Redis for socket.io (optional)
+    # Chat history archiving
+    MESSAGE_ARCHIVE_AFTER_DAYS = int(os.environ.get('MESSAGE_ARCHIVE_AFTER_DAYS') or 30)
+    MESSAGE_ARCHIVE_SEGMENT_SIZE = 500  # messages per compressed segment
+    MESSAGE_PAGE_SIZE = 50
+    
+    # Notifications
+    NOTIFICATION_BULK_MAX_IDS = 1000  # max ids accepted by the bulk endpoints
+    NOTIFICATION_REPLAY_LIMIT = 100  # max unacked notifications replayed per sync
+    
+    # Notification types that collapse into one unread row per (user, type, related_id).
+    # `message` is re-rendered with {count} each time another event is folded in.
+    NOTIFICATION_COALESCE_RULES = {
+        'message': {
+            'message': 'You have received {count} new messages'
+        }
+    }
+    
+    # Preference a user must have switched on to receive each notification
+    # type; types not listed here are always delivered
+    NOTIFICATION_TYPE_PREFERENCES = {
+        'message': 'message_notifications',
+        'credential_expiry': 'credential_reminders'
+    }
+    
+    # Retention: notifications matching a policy are purged after `days`.
+    # `notification_type` None matches any type without a policy of its own;
+    # `read` True/False limits a policy to read/unread rows.
+    NOTIFICATION_RETENTION_POLICIES = [
+        {'notification_type': 'message', 'read': True, 'days': 30},
+        {'notification_type': 'job_alert', 'read': True, 'days': 30},
+        {'notification_type': None, 'read': True, 'days': 90},
+        {'notification_type': None, 'read': False, 'days': 365},
+    ]
+    NOTIFICATION_PURGE_BATCH_SIZE = 500
+    NOTIFICATION_PURGE_PAUSE_SECONDS = 0.1  # pause between batches to let other writers in
+    
+    # Credential expiry reminders are sent this many days before expiry
+    CREDENTIAL_EXPIRY_REMINDER_DAYS = (30, 7)
+    CREDENTIAL_REMINDER_BATCH_SIZE = 500
+    
+    # Windowed (7d/30d/month) leaderboards are cached this long
+    LEADERBOARD_CACHE_SECONDS = 60
+    
+    # Redis for socket.io and the shared TTL store (optional; in-memory per process without it)
     REDIS_URL = os.environ.get('REDIS_URL')
+    KV_SWEEP_INTERVAL_SECONDS = 60  # in-memory store: how often expired keys are removed
+    
+    # bcrypt work factor; existing hashes made with another value are upgraded on login
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS') or 12)
+    # Password hashing runs on a pool of this many threads, which also caps concurrent hashes
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 2)
+    
+    # current_user is served from a per-process LRU of this many users; entries
+    # are invalidated on change and never trusted for longer than the TTL. Only
+    # used with REDIS_URL, since invalidations must reach every worker
+    USER_CACHE_SIZE = 1024
+    USER_CACHE_TTL_SECONDS = 300
+    
+    # One-time passwords expire after this long
+    OTP_TTL_SECONDS = 600
+    
+    # Number of reverse proxies (nginx, load balancer) in front of the app whose
+    # X-Forwarded-* headers are trusted; 0 when clients connect directly
+    PROXY_FIX_HOPS = int(os.environ.get('PROXY_FIX_HOPS') or 0)
+    
+    # Sliding-window limits per endpoint scope: {identity: (attempts, seconds)}.
+    # 'ip' is the client address; any other identity is a JSON body field.
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMITS = {
+        'login': {'ip': (30, 60), 'phone_number': (5, 300)},
+        'signup': {'ip': (10, 3600), 'phone_number': (3, 3600)},
+        'forgot_password': {'ip': (10, 3600), 'phone_number': (3, 900)},
+        'check_otp': {'ip': (30, 600), 'phone_number': (5, 600)},
+    }
+    
+    # Coalesce socket emits to the same rooms within this window (0 = send immediately)
+    SOCKETIO_COALESCE_WINDOW_MS = int(os.environ.get('SOCKETIO_COALESCE_WINDOW_MS') or 0)
     
     # OAuth configurations
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     LINKEDIN_CLIENT_ID = os.environ.get('LINKEDIN_CLIENT_ID')
     LINKEDIN_CLIENT_SECRET = os.environ.get('LINKEDIN_CLIENT_SECRET')
     
+    # Google ID tokens are verified locally against these keys (cached per Cache-Control).
+    # GOOGLE_JWKS may hold a fixed {"keys": [...]} set instead, e.g. a local test key.
+    GOOGLE_JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+    GOOGLE_JWKS = None
+    
+    # Outbound provider calls: (connect, read) timeout in seconds and keep-alive pool size
+    SOCIAL_HTTP_TIMEOUT = (3.05, 10)
+    SOCIAL_HTTP_POOL_SIZE = 10
+    
+    # Upload storage: 'local' (UPLOAD_FOLDER) or 's3' (any S3-compatible service)
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND') or 'local'
+    S3_BUCKET = os.environ.get('S3_BUCKET')
+    S3_ENDPOINT_URL = os.environ.get('S3_ENDPOINT_URL')  # e.g. MinIO; unset for AWS
+    S3_REGION = os.environ.get('S3_REGION')
+    S3_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+    S3_PRESIGNED_URL_EXPIRES = 3600  # seconds
+    
+    # Unreferenced upload blobs are garbage collected after this long
+    UPLOAD_GC_GRACE_HOURS = 24
+    
+    # How local uploads are sent: 'app' (send_file with Range/ETag), 'x-accel'
+    # (nginx X-Accel-Redirect to X_ACCEL_REDIRECT_PREFIX/<key>) or 'x-sendfile'
+    FILE_SERVING_MODE = os.environ.get('FILE_SERVING_MODE') or 'app'
+    X_ACCEL_REDIRECT_PREFIX = os.environ.get('X_ACCEL_REDIRECT_PREFIX') or '/protected-uploads'
+    
+    # Profile image renditions, generated off the request path
+    PROFILE_IMAGE_SIZES = (64, 128, 512)
+    PROFILE_IMAGE_FORMATS = ('webp', 'jpeg')
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS') or 2)
+    
+    # Resume text extraction for candidate search
+    RESUME_WORKERS = int(os.environ.get('RESUME_WORKERS') or 2)
+    
     # Upload paths for different file types
     RESUME_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, 'resumes')
     CREDENTIAL_UPLOAD_FOLDER = os.path.join(UPLOAD_FOLDER, 'credentials')
@@ -3,9 +3,14 @@ from app import db
 # Import models to make them available for migrations
 from backend.models.user import User
 from backend.models.job import Job, SavedJob, JobApplication
-from backend.models.message import Message, Conversation
-from backend.models.notification import Notification
-from backend.models.credential import Credential
+from backend.models.message import Message, Conversation, MessageArchive
+from backend.models.notification import Notification, NotificationCounter
+from backend.models.credential import Credential, CredentialReminder
 from backend.models.payment import Payment
-from backend.models.reward import Reward
+from backend.models.reward import Reward, UserPoints, RewardBucket
 from backend.models.schedule import Schedule
+from backend.models.candidate import CandidateSearch, ResumeSkill
+from backend.models.stored_file import StoredFile
+from backend.models.skill import Skill, SkillAlias, user_skill
+from backend.models.checkpoint import JobCheckpoint
+from backend.models.revoked_token import RevokedToken
@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import func, literal_column
+from app import db
+
+class CandidateSearch(db.Model):
+    """Text extracted from a user's current resume, for recruiter search"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    resume_url = db.Column(db.String(255), nullable=False)  # resume the text was extracted from
+    resume_text = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    user = db.relationship('User', back_populates='candidate_search')
+    skills = db.relationship('ResumeSkill', lazy=True, cascade='all, delete-orphan',
+                             primaryjoin='CandidateSearch.user_id == foreign(ResumeSkill.user_id)')
+    
+    # Full-text index on PostgreSQL; other databases fall back to LIKE
+    __table_args__ = (
+        db.Index(
+            'ix_candidate_search_text',
+            func.to_tsvector(literal_column("'english'::regconfig"), resume_text),
+            postgresql_using='gin'
+        ).ddl_if(dialect='postgresql'),
+    )
+    
+    def to_dict(self):
+        return {
+            'user': self.user.to_public_dict() if self.user else None,
+            'skills': sorted(skill.term for skill in self.skills),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ResumeSkill(db.Model):
+    """Inverted index of skill terms found in resumes: term -> users"""
+    term = db.Column(db.String(100), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True, index=True)
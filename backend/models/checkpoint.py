@@ -0,0 +1,8 @@
+from datetime import datetime
+from app import db
+
+class JobCheckpoint(db.Model):
+    """Progress marker for a batch job, so a restarted run picks up where it stopped"""
+    name = db.Column(db.String(100), primary_key=True)
+    position = db.Column(db.Integer, nullable=False, default=0)  # last id processed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -3,17 +3,19 @@ from app import db
 
 class Credential(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
     credential_type = db.Column(db.String(50), nullable=True)  # certificate, degree, license
     issuer = db.Column(db.String(100), nullable=True)
     issue_date = db.Column(db.DateTime, nullable=True)
-    expiry_date = db.Column(db.DateTime, nullable=True)
+    expiry_date = db.Column(db.DateTime, nullable=True, index=True)
     file_url = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    reminders = db.relationship('CredentialReminder', backref='credential', lazy=True, cascade='all, delete-orphan')
+    
     def to_dict(self):
         return {
             'id': self.id,
@@ -25,4 +27,11 @@ class Credential(db.Model):
             'expiry_date': self.expiry_date.isoformat() if self.expiry_date else None,
             'file_url': self.file_url,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class CredentialReminder(db.Model):
+    """An expiry reminder already sent, so the daily scan never sends it twice"""
+    credential_id = db.Column(db.Integer, db.ForeignKey('credential.id'), primary_key=True)
+    expiry_date = db.Column(db.DateTime, primary_key=True)  # a renewed credential gets new reminders
+    days_before = db.Column(db.Integer, primary_key=True)  # which reminder (e.g. 30 or 7 days out)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,3 +1,5 @@
+import json
+import zlib
 from datetime import datetime
 from app import db
 
@@ -11,12 +13,17 @@ class Conversation(db.Model):
     
     # Relationships
     messages = db.relationship('Message', backref='conversation', lazy=True)
+    archives = db.relationship('MessageArchive', backref='conversation', lazy='dynamic')
     user1 = db.relationship('User', foreign_keys=[user1_id])
     user2 = db.relationship('User', foreign_keys=[user2_id])
     
     def get_last_message(self):
         if not self.messages:
-            return None
+            # Everything may have been moved to the archive
+            archive = self.archives.order_by(MessageArchive.last_message_id.desc()).first()
+            if not archive:
+                return None
+            return ArchivedMessage(archive.get_messages()[-1])
         return sorted(self.messages, key=lambda x: x.created_at, reverse=True)[0]
     
     def to_dict(self):
@@ -31,11 +38,11 @@ class Conversation(db.Model):
 
 class Message(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id'), nullable=False)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id'), nullable=False, index=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     text = db.Column(db.Text, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     read_at = db.Column(db.DateTime, nullable=True)
     
     def to_dict(self):
@@ -48,4 +55,38 @@ class Message(db.Model):
             'created_at': self.created_at.isoformat(),
             'read_at': self.read_at.isoformat() if self.read_at else None,
             'is_read': self.read_at is not None
-        }
\ No newline at end of file
+        }
+
+class MessageArchive(db.Model):
+    """A compressed block of old messages from a single conversation"""
+    id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id'), nullable=False)
+    first_message_id = db.Column(db.Integer, nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=False)
+    first_created_at = db.Column(db.DateTime, nullable=False)
+    last_created_at = db.Column(db.DateTime, nullable=False)
+    message_count = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed JSON list of message dicts
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Segments are always looked up per conversation, walking backwards by message id
+    __table_args__ = (db.Index('ix_message_archive_conversation_last_id', 'conversation_id', 'last_message_id'),)
+    
+    @staticmethod
+    def compress(message_dicts):
+        return zlib.compress(json.dumps(message_dicts, separators=(',', ':')).encode('utf-8'))
+    
+    def get_messages(self):
+        """Decompress the segment into message dicts, oldest first"""
+        return json.loads(zlib.decompress(self.payload).decode('utf-8'))
+
+class ArchivedMessage:
+    """Read-only stand-in for a Message that lives in a MessageArchive segment"""
+    
+    def __init__(self, data):
+        self.data = data
+        self.id = data['id']
+        self.created_at = datetime.fromisoformat(data['created_at'])
+    
+    def to_dict(self):
+        return self.data
@@ -1,5 +1,9 @@
 from datetime import datetime
 from app import db
+from backend.config import Config
+
+# Types that keep a single unread row per (user, type, related_id)
+COALESCED_NOTIFICATION_TYPES = tuple(Config.NOTIFICATION_COALESCE_RULES)
 
 class Notification(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -8,8 +12,24 @@ class Notification(db.Model):
     message = db.Column(db.String(255), nullable=False)
     notification_type = db.Column(db.String(50), nullable=False)  # message, job_alert, application_update
     related_id = db.Column(db.Integer, nullable=True)  # ID of related entity (job, message, etc.)
+    count = db.Column(db.Integer, nullable=False, default=1)  # events coalesced into this notification
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     read_at = db.Column(db.DateTime, nullable=True)
+    delivered_at = db.Column(db.DateTime, nullable=True)  # set when the client acks the socket push
+    
+    __table_args__ = (
+        # Listing and the bulk operations all select a user's rows by creation time
+        db.Index('ix_notification_user_created', 'user_id', 'created_at'),
+        # Lookup of the unread notification to coalesce into
+        db.Index('ix_notification_coalesce', 'user_id', 'notification_type', 'related_id'),
+        # At most one unread row per coalescing key, so concurrent senders can't both insert
+        db.Index(
+            'uq_notification_unread_coalesce', 'user_id', 'notification_type', 'related_id',
+            unique=True,
+            postgresql_where=db.and_(read_at == None, notification_type.in_(COALESCED_NOTIFICATION_TYPES)),
+            sqlite_where=db.and_(read_at == None, notification_type.in_(COALESCED_NOTIFICATION_TYPES))
+        ),
+    )
     
     def to_dict(self):
         return {
@@ -18,7 +38,22 @@ class Notification(db.Model):
             'message': self.message,
             'notification_type': self.notification_type,
             'related_id': self.related_id,
+            'count': self.count or 1,
             'created_at': self.created_at.isoformat(),
             'read_at': self.read_at.isoformat() if self.read_at else None,
             'is_read': self.read_at is not None
-        }
\ No newline at end of file
+        }
+
+class NotificationCounter(db.Model):
+    """Per-user notification totals, kept in step with the Notification table"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'unread_count': self.unread,
+            'read_count': self.total - self.unread
+        }
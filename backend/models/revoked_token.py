@@ -0,0 +1,14 @@
+from datetime import datetime
+from app import db
+
+class RevokedToken(db.Model):
+    """
+    A revoked access token (jti) or a cutoff revoking all of a user's
+    tokens issued before `issued_before`; kept until those tokens expire
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=True, unique=True)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    issued_before = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
@@ -16,4 +16,17 @@ class Reward(db.Model):
             'action': self.action,
             'description': self.description,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+class UserPoints(db.Model):
+    """Running reward totals per user, kept in step with Reward inserts"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    points = db.Column(db.Integer, nullable=False, default=0, index=True)  # leaderboard order
+    entries = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class RewardBucket(db.Model):
+    """Points a user earned on one (UTC) day; windowed leaderboards sum these"""
+    day = db.Column(db.Date, primary_key=True)  # first, so a date range is one index range
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    points = db.Column(db.Integer, nullable=False, default=0)
@@ -1,6 +1,47 @@
 from datetime import datetime
 from app import db
 
+SLOT_MINUTES = 15
+SLOTS_PER_HALF_DAY = 12 * 60 // SLOT_MINUTES  # 48 slots fit in a BIGINT
+
+def parse_time(value):
+    """Minutes since midnight for an "HH:MM" string ("24:00" allowed), or None"""
+    try:
+        hours, minutes = value.split(':')
+        hours, minutes = int(hours), int(minutes)
+    except (AttributeError, ValueError):
+        return None
+    
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        return None
+    return hours * 60 + minutes
+
+def slot_masks(start_time, end_time, outward=False):
+    """
+    (am, pm) bitmasks of the 15-minute slots covered by start_time-end_time
+    
+    Slot n covers [n*15, n*15+15) minutes. By default a partly covered slot
+    is left out, so a schedule never claims more availability than it was
+    given; `outward` includes it instead, for the slots a search requires.
+    A range that ends at or before it starts runs until midnight.
+    """
+    start = parse_time(start_time)
+    end = parse_time(end_time)
+    if end <= start:
+        end = 24 * 60
+    
+    if outward:
+        first, last = start // SLOT_MINUTES, -(-end // SLOT_MINUTES)
+    else:
+        first, last = -(-start // SLOT_MINUTES), end // SLOT_MINUTES
+    
+    mask = 0
+    if last > first:
+        mask = ((1 << (last - first)) - 1) << first
+    
+    half = (1 << SLOTS_PER_HALF_DAY) - 1
+    return mask & half, mask >> SLOTS_PER_HALF_DAY
+
 class Schedule(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -8,11 +49,34 @@ class Schedule(db.Model):
     start_time = db.Column(db.String(5), nullable=False)  # Format: "09:00"
     end_time = db.Column(db.String(5), nullable=False)  # Format: "17:00"
     availability = db.Column(db.Boolean, default=True)
+    # Availability index: one bit per 15-minute slot, 00:00-12:00 and 12:00-24:00
+    slots_am = db.Column(db.BigInteger, nullable=False, default=0)
+    slots_pm = db.Column(db.BigInteger, nullable=False, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    # Define unique constraint to avoid duplicate schedules for the same day
-    __table_args__ = (db.UniqueConstraint('user_id', 'day_of_week', name='user_day_schedule_unique'),)
+    __table_args__ = (
+        # Define unique constraint to avoid duplicate schedules for the same day
+        db.UniqueConstraint('user_id', 'day_of_week', name='user_day_schedule_unique'),
+        # Availability searches narrow by day first, then test the slot bits
+        db.Index('ix_schedule_day_available', 'day_of_week', 'availability'),
+    )
+    
+    def set_hours(self, start_time, end_time):
+        self.start_time = start_time
+        self.end_time = end_time
+        self.slots_am, self.slots_pm = slot_masks(start_time, end_time)
+    
+    @staticmethod
+    def covers(day_of_week, start_time, end_time):
+        """SQL predicate for schedules available for the whole of start_time-end_time"""
+        am, pm = slot_masks(start_time, end_time, outward=True)
+        return db.and_(
+            Schedule.day_of_week == day_of_week,
+            Schedule.availability == True,
+            Schedule.slots_am.op('&')(am) == am,
+            Schedule.slots_pm.op('&')(pm) == pm
+        )
     
     def to_dict(self):
         return {
@@ -21,4 +85,4 @@ class Schedule(db.Model):
             'start_time': self.start_time,
             'end_time': self.end_time,
             'availability': self.availability
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,31 @@
+from datetime import datetime
+from app import db
+
+# Inverted index between users and skills; the primary key covers lookups
+# by user, the extra index covers lookups by skill
+user_skill = db.Table(
+    'user_skill',
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Column('skill_id', db.Integer, db.ForeignKey('skill.id'), primary_key=True),
+    db.Index('ix_user_skill_skill_user', 'skill_id', 'user_id')
+)
+
+class Skill(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)  # canonical, case-folded
+    display_name = db.Column(db.String(100), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    aliases = db.relationship('SkillAlias', backref='skill', lazy=True)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'display_name': self.display_name
+        }
+
+class SkillAlias(db.Model):
+    """Alternative spelling that canonicalizes to a Skill (e.g. "js" -> "javascript")"""
+    alias = db.Column(db.String(100), primary_key=True)  # case-folded
+    skill_id = db.Column(db.Integer, db.ForeignKey('skill.id'), nullable=False)
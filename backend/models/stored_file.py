@@ -0,0 +1,15 @@
+from datetime import datetime
+from app import db
+
+class StoredFile(db.Model):
+    """A content-addressed upload blob and how many rows point at it"""
+    key = db.Column(db.String(255), primary_key=True)  # <folder>/<sha256>.<ext>
+    sha256 = db.Column(db.String(64), nullable=False, index=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    released_at = db.Column(db.DateTime, nullable=True)  # when ref_count last dropped to zero
+    
+    # The garbage collector looks for unreferenced blobs
+    __table_args__ = (db.Index('ix_stored_file_ref_count', 'ref_count'),)
@@ -1,5 +1,36 @@
 from datetime import datetime
-from app import db, bcrypt
+from app import db
+from backend.services.password_service import hash_password, verify_password, password_needs_rehash
+
+# Default notification preferences; the order fixes each one's bit in the mask
+DEFAULT_NOTIFICATION_PREFERENCES = {
+    "email_notifications": True,
+    "push_notifications": True,
+    "sms_notifications": True,
+    "job_alerts": True,
+    "message_notifications": True,
+    "application_updates": True,
+    "credential_reminders": True
+}
+NOTIFICATION_PREFERENCE_BITS = {
+    name: 1 << index for index, name in enumerate(DEFAULT_NOTIFICATION_PREFERENCES)
+}
+ALL_NOTIFICATION_PREFERENCES = (1 << len(NOTIFICATION_PREFERENCE_BITS)) - 1
+
+DEFAULT_PRIVACY_SETTINGS = {
+    "profile_visibility": "public",
+    "resume_visibility": "connections",
+    "contact_info_visibility": "connections",
+    "job_application_visibility": "private"
+}
+
+def notification_preference_mask(preferences):
+    """Pack a preferences dict into an integer; missing keys take their default"""
+    mask = 0
+    for name, bit in NOTIFICATION_PREFERENCE_BITS.items():
+        if (preferences or {}).get(name, DEFAULT_NOTIFICATION_PREFERENCES[name]):
+            mask |= bit
+    return mask
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -17,9 +48,15 @@ class User(db.Model):
     skills = db.Column(db.Text, nullable=True)
     resume_url = db.Column(db.String(255), nullable=True)
     profile_image = db.Column(db.String(255), nullable=True)
+    profile_image_renditions = db.Column(db.JSON, nullable=True)  # {"64": {"webp": filename, "jpeg": filename}, ...}
     
     # Settings
     notification_preferences = db.Column(db.JSON, default={})
+    # Bitmask form of notification_preferences for filtering recipients in SQL
+    notification_preference_mask = db.Column(
+        db.Integer, nullable=False, index=True,
+        default=ALL_NOTIFICATION_PREFERENCES, server_default=str(ALL_NOTIFICATION_PREFERENCES)
+    )
     privacy_settings = db.Column(db.JSON, default={})
     
     # Relationships
@@ -28,16 +65,64 @@ class User(db.Model):
     messages_sent = db.relationship('Message', foreign_keys='Message.sender_id', backref='sender', lazy=True)
     messages_received = db.relationship('Message', foreign_keys='Message.receiver_id', backref='receiver', lazy=True)
     notifications = db.relationship('Notification', backref='user', lazy=True)
-    credentials = db.relationship('Credential', backref='user', lazy=True)
+    notification_counter = db.relationship('NotificationCounter', uselist=False, cascade='all, delete-orphan')
+    credentials = db.relationship('Credential', backref='user', lazy=True, cascade='all, delete-orphan')
     payments = db.relationship('Payment', backref='user', lazy=True)
-    rewards = db.relationship('Reward', backref='user', lazy=True)
+    rewards = db.relationship('Reward', backref='user', lazy=True, cascade='all, delete-orphan')
+    user_points = db.relationship('UserPoints', uselist=False, cascade='all, delete-orphan')
+    reward_buckets = db.relationship('RewardBucket', lazy=True, cascade='all, delete-orphan')
     schedules = db.relationship('Schedule', backref='user', lazy=True)
+    candidate_search = db.relationship('CandidateSearch', uselist=False, back_populates='user',
+                                       cascade='all, delete-orphan')
+    skill_set = db.relationship('Skill', secondary='user_skill', backref='users', lazy=True)
 
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
         
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        return password_needs_rehash(self.password_hash)
+    
+    def set_notification_preferences(self, preferences):
+        self.notification_preferences = preferences
+        self.notification_preference_mask = notification_preference_mask(preferences)
+    
+    @staticmethod
+    def wants_notification(preference):
+        """
+        SQL predicate for users who have `preference` switched on
+        
+        Written as an IN over the (few) mask values that have the bit set,
+        so it can use the index on notification_preference_mask.
+        """
+        bit = NOTIFICATION_PREFERENCE_BITS[preference]
+        masks = [mask for mask in range(ALL_NOTIFICATION_PREFERENCES + 1) if mask & bit]
+        return User.notification_preference_mask.in_(masks)
+    
+    @staticmethod
+    def profile_is_public():
+        """SQL predicate for users whose profile may be listed to anyone (the default)"""
+        visibility = User.privacy_settings['profile_visibility'].as_string()
+        return db.or_(visibility == None, visibility == 'public')
+    
+    def get_notification_preferences(self):
+        """Stored preferences, with defaults for any added since they were saved"""
+        return {**DEFAULT_NOTIFICATION_PREFERENCES, **(self.notification_preferences or {})}
+    
+    def get_profile_image(self, size=None, image_format='jpeg'):
+        """
+        Filename of the smallest rendition at least `size` px wide (the largest
+        without a size), else the original while renditions are still pending
+        """
+        renditions = self.profile_image_renditions or {}
+        if not renditions:
+            return self.profile_image
+        
+        sizes = sorted(int(s) for s in renditions)
+        best = sizes[-1] if size is None else next((s for s in sizes if s >= size), sizes[-1])
+        return renditions[str(best)].get(image_format) or self.profile_image
     
     def to_dict(self):
         return {
@@ -47,6 +132,14 @@ class User(db.Model):
             'email': self.email
         }
     
+    def to_public_dict(self):
+        """What other users may see in candidate listings: no contact details"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'skills': self.skills.split(',') if self.skills else []
+        }
+    
     def get_full_profile(self):
         """Extended user data for profile endpoint"""
         return {
@@ -58,5 +151,6 @@ class User(db.Model):
             'skills': self.skills.split(',') if self.skills else [],
             'resume_url': self.resume_url,
             'profile_image': self.profile_image,
+            'profile_image_renditions': self.profile_image_renditions or {},
             'created_at': self.created_at.isoformat()
         }
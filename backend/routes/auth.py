@@ -1,14 +1,17 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+from flask_jwt_extended import create_access_token, get_jwt_identity, get_jwt, jwt_required
 
-from app import db, bcrypt
+from app import db
 from backend.models.user import User
 from backend.services.auth_service import send_otp, verify_otp
+from backend.services.rate_limit_service import rate_limit
+from backend.services.revocation_service import revoke_token, revoke_user_tokens
 from backend.services.social_service import verify_google_token, verify_linkedin_token
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit('login')
 def login():
     data = request.get_json()
     phone_number = data.get('phone_number')
@@ -17,6 +20,11 @@ def login():
     user = User.query.filter_by(phone_number=phone_number).first()
     
     if user and user.check_password(password):
+        # Upgrade hashes made with an older work factor while we have the password
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+        
         access_token = create_access_token(identity=str(user.id))
         return {
             "status": "success",
@@ -86,6 +94,7 @@ def linkedin_login():
     }
 
 @auth_bp.route('/forgot-password', methods=['POST'])
+@rate_limit('forgot_password')
 def forgot_password():
     data = request.get_json()
     phone_number = data.get('phone_number')
@@ -103,6 +112,7 @@ def forgot_password():
     }
 
 @auth_bp.route('/check-otp', methods=['POST'])
+@rate_limit('check_otp')
 def check_otp():
     data = request.get_json()
     otp = data.get('otp')
@@ -131,6 +141,8 @@ def reset_password():
         return {"status": "error", "message": "User not found"}, 404
     
     user.set_password(new_password)
+    # Sessions opened with the old password end here
+    revoke_user_tokens(user.id)
     db.session.commit()
     
     return {
@@ -139,6 +151,7 @@ def reset_password():
     }
 
 @auth_bp.route('/signup', methods=['POST'])
+@rate_limit('signup')
 def signup():
     data = request.get_json()
     phone_number = data.get('phone_number')
@@ -164,8 +177,10 @@ def signup():
 @auth_bp.route('/logout', methods=['POST'])
 @jwt_required()
 def logout():
-    # JWT tokens are stateless, so we don't need to invalidate them server-side
-    # Client should discard the token
+    # Revoke this token until it expires; the client should discard it too
+    revoke_token(get_jwt())
+    db.session.commit()
+    
     return {
         "status": "success",
         "message": "Logged out successfully"
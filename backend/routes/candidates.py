@@ -0,0 +1,136 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, or_
+from sqlalchemy.orm import selectinload
+
+from app import db
+from backend.models.candidate import CandidateSearch, ResumeSkill
+from backend.models.schedule import Schedule, parse_time
+from backend.models.skill import user_skill
+from backend.models.user import User
+from backend.services.skill_service import canonical_skill_name, split_skills, resolve_skill_ids
+
+candidates_bp = Blueprint('candidates', __name__)
+
+@candidates_bp.route('/search', methods=['GET'])
+@jwt_required()
+def search_candidates():
+    """Search candidates by resume content and/or skill terms"""
+    keyword = request.args.get('q', '').strip()
+    skills = [canonical_skill_name(s) for s in split_skills(request.args.get('skills', ''))]
+    page = int(request.args.get('page', 1))
+    limit = int(request.args.get('limit', 20))
+    
+    if not keyword and not skills:
+        return {"status": "error", "message": "q or skills is required"}, 400
+    
+    # Respect users who keep their profile or resume private (in SQL, so total and pages agree)
+    resume_visibility = User.privacy_settings['resume_visibility'].as_string()
+    query = CandidateSearch.query.join(User, User.id == CandidateSearch.user_id)\
+        .filter(User.profile_is_public(), or_(resume_visibility == None, resume_visibility != 'private'))
+    
+    if skills:
+        # Users having every requested term, straight from the term index
+        matching_users = db.session.query(ResumeSkill.user_id)\
+            .filter(ResumeSkill.term.in_(skills))\
+            .group_by(ResumeSkill.user_id)\
+            .having(func.count(ResumeSkill.term) == len(set(skills)))
+        query = query.filter(CandidateSearch.user_id.in_(matching_users))
+    
+    if keyword:
+        if db.engine.dialect.name == 'postgresql':
+            # Uses the GIN index on the resume text
+            query = query.filter(
+                func.to_tsvector('english', CandidateSearch.resume_text)
+                .op('@@')(func.plainto_tsquery('english', keyword))
+            )
+        else:
+            query = query.filter(CandidateSearch.resume_text.ilike(f'%{keyword}%'))
+    
+    total = query.count()
+    candidates = query.options(selectinload(CandidateSearch.user), selectinload(CandidateSearch.skills))\
+        .order_by(CandidateSearch.updated_at.desc())\
+        .offset((page - 1) * limit)\
+        .limit(limit)\
+        .all()
+    
+    return {
+        "status": "success",
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "candidates": [candidate.to_dict() for candidate in candidates]
+    }
+
+@candidates_bp.route('/available', methods=['GET'])
+@jwt_required()
+def available_candidates():
+    """Users whose working schedule covers a whole time range on a given day"""
+    day_of_week = request.args.get('day', type=int)
+    start_time = request.args.get('start')
+    end_time = request.args.get('end')
+    page = int(request.args.get('page', 1))
+    limit = int(request.args.get('limit', 20))
+    
+    if day_of_week not in range(7):
+        return {"status": "error", "message": "day must be between 0 (Monday) and 6 (Sunday)"}, 400
+    
+    if parse_time(start_time) is None or parse_time(end_time) is None:
+        return {"status": "error", "message": "start and end must be in HH:MM format"}, 400
+    
+    query = db.session.query(User, Schedule).join(Schedule, Schedule.user_id == User.id)\
+        .filter(Schedule.covers(day_of_week, start_time, end_time), User.profile_is_public())
+    
+    total = query.count()
+    rows = query.order_by(User.id).offset((page - 1) * limit).limit(limit).all()
+    
+    return {
+        "status": "success",
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "users": [
+            {**user.to_public_dict(), "schedule": schedule.to_dict()}
+            for user, schedule in rows
+        ]
+    }
+
+@candidates_bp.route('/by-skills', methods=['GET'])
+@jwt_required()
+def candidates_by_skills():
+    """Users who list the given profile skills (all of them, or any with match=any)"""
+    names = split_skills(request.args.get('skills', ''))
+    match = request.args.get('match', 'all')
+    page = int(request.args.get('page', 1))
+    limit = int(request.args.get('limit', 20))
+    
+    if not names:
+        return {"status": "error", "message": "skills is required"}, 400
+    
+    if match not in ('all', 'any'):
+        return {"status": "error", "message": "match must be 'all' or 'any'"}, 400
+    
+    skill_ids, all_known = resolve_skill_ids(names)
+    
+    if not skill_ids or (match == 'all' and not all_known):
+        return {"status": "success", "total": 0, "page": page, "limit": limit, "users": []}
+    
+    # Intersect (or union) the per-skill posting lists on the (skill_id, user_id) index
+    matching_users = db.session.query(user_skill.c.user_id)\
+        .filter(user_skill.c.skill_id.in_(skill_ids))\
+        .group_by(user_skill.c.user_id)
+    if match == 'all':
+        matching_users = matching_users.having(func.count() == len(skill_ids))
+    
+    query = User.query.filter(User.id.in_(matching_users), User.profile_is_public())
+    
+    total = query.count()
+    users = query.order_by(User.id).offset((page - 1) * limit).limit(limit).all()
+    
+    return {
+        "status": "success",
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "users": [user.to_public_dict() for user in users]
+    }
@@ -1,17 +1,15 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 
 from app import db
 from backend.models.job import Job, SavedJob, JobApplication
-from backend.models.user import User
 
 jobs_bp = Blueprint('jobs', __name__)
 
 @jobs_bp.route('/jobs/recommended', methods=['GET'])
 @jwt_required()
 def get_recommended_jobs():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_user
     
     # Get filter parameters
     filters = request.args.to_dict()
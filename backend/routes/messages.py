@@ -1,12 +1,15 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, session
+from flask_jwt_extended import jwt_required, get_jwt_identity, decode_token
 from sqlalchemy import or_, and_
-from flask_socketio import emit, join_room, leave_room
+from flask_socketio import join_room, leave_room
 
 from app import db, socketio
 from backend.models.message import Message, Conversation
 from backend.models.user import User
-from backend.models.notification import Notification
+from backend.services.archive_service import get_conversation_messages
+from backend.services.fanout_service import emit_to_rooms
+from backend.services.notification_service import send_notification
+from backend.services.revocation_service import is_token_revoked
 from datetime import datetime
 
 # Define the Blueprint for messages
@@ -62,8 +65,12 @@ def get_message_detail(id):
     if not conversation:
         return {"status": "error", "message": "Conversation not found"}, 404
     
+    # Optional cursor paging; older pages are read from the archive when needed
+    before_id = request.args.get('before_id', type=int)
+    limit = request.args.get('limit', type=int)
+    
     # Get messages in this conversation
-    messages = Message.query.filter_by(conversation_id=id).order_by(Message.created_at).all()
+    messages, has_more = get_conversation_messages(id, before_id=before_id, limit=limit)
     
     # Mark unread messages as read
     unread_messages = Message.query.filter_by(
@@ -80,13 +87,34 @@ def get_message_detail(id):
     return {
         "status": "success",
         "conversation": conversation.to_dict(),
-        "messages": [msg.to_dict() for msg in messages]
+        "messages": messages,
+        "has_more": has_more
     }
 
 # WebSocket event handlers
 @socketio.on('connect')
-def handle_connect():
-    # Authentication is handled by the decorator in app.py
+def handle_connect(auth=None):
+    # Authenticate with the JWT from the Socket.IO auth payload or ?token=
+    token = (auth or {}).get('token') or request.args.get('token')
+    if not token:
+        return False
+    
+    try:
+        payload = decode_token(token)
+    except Exception:
+        return False
+    
+    # Logged-out tokens, and those revoked by a password change or account deletion
+    if is_token_revoked(payload):
+        return False
+    
+    user_id = int(payload['sub'])
+    
+    # Remembered for the lifetime of this socket
+    session['user_id'] = user_id
+    
+    # Every socket joins its user's room so notifications can be pushed to it
+    join_room(f"user_{user_id}")
     print("Client connected")
 
 @socketio.on('disconnect')
@@ -95,7 +123,7 @@ def handle_disconnect():
 
 @socketio.on('join')
 def handle_join(data):
-    user_id = get_jwt_identity()
+    user_id = session.get('user_id')
     
     # Create a room for the user to receive messages
     room = f"user_{user_id}"
@@ -111,7 +139,7 @@ def handle_join(data):
 
 @socketio.on('leave')
 def handle_leave(data):
-    user_id = get_jwt_identity()
+    user_id = session.get('user_id')
     
     if 'conversation_id' in data:
         room = f"conversation_{data['conversation_id']}"
@@ -120,7 +148,7 @@ def handle_leave(data):
 
 @socketio.on('message')
 def handle_message(data):
-    user_id = get_jwt_identity()
+    user_id = session.get('user_id')
     receiver_id = data.get('receiver_id')
     text = data.get('text')
     conversation_id = data.get('conversation_id')
@@ -175,27 +203,24 @@ def handle_message(data):
     # Update conversation timestamp
     conversation.updated_at = datetime.utcnow()
     
-    # Create notification for recipient
-    notification = Notification(
+    # Notify the recipient; unread message notifications for the same
+    # conversation are coalesced into one
+    send_notification(
         user_id=receiver_id,
         title="New Message",
         message=f"You have received a new message",
         notification_type="message",
         related_id=conversation.id
     )
-    db.session.add(notification)
     
     db.session.commit()
     
-    # Emit to both the recipient's user room and the conversation room
+    # Emit to both the recipient's user room and the conversation room;
+    # sockets in both rooms only receive the message once
     message_data = message.to_dict()
-    
-    # Send to recipient's personal room
-    recipient_room = f"user_{receiver_id}"
-    emit('new_message', message_data, room=recipient_room)
-    
-    # Send to conversation room
-    conversation_room = f"conversation_{conversation.id}"
-    emit('new_message', message_data, room=conversation_room)
+    emit_to_rooms('new_message', message_data, [
+        f"user_{receiver_id}",
+        f"conversation_{conversation.id}"
+    ])
     
     return {"status": "success", "message": message_data}
\ No newline at end of file
@@ -1,9 +1,14 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, session
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 
-from app import db
+from app import db, socketio
 from backend.models.notification import Notification
+from backend.services.notification_service import (
+    get_notification_counter, mark_all_notifications_read, mark_notifications_read,
+    delete_notifications, read_notification, remove_notification,
+    acknowledge_notifications, get_undelivered_notifications
+)
 
 notifications_bp = Blueprint('notifications', __name__)
 
@@ -14,11 +19,8 @@ def get_notification_list():
     page = int(request.args.get('page', 1))
     limit = int(request.args.get('limit', 20))
     
-    # Get total notification count
-    total = Notification.query.filter_by(user_id=user_id).count()
-    
-    # Get read notification count
-    read_count = Notification.query.filter_by(user_id=user_id).filter(Notification.read_at != None).count()
+    # Total and read counts come from the per-user counter instead of two full counts
+    counter = get_notification_counter(user_id)
     
     # Get notifications with pagination
     notifications = Notification.query.filter_by(user_id=user_id)\
@@ -27,34 +29,103 @@ def get_notification_list():
         .limit(limit)\
         .all()
     
+    # Persist the counter if it was just backfilled
+    db.session.commit()
+    
     return {
         "status": "success",
-        "total": total,
+        "total": counter.total,
         "page": page,
         "limit": limit,
-        "read_count": read_count,
+        "read_count": counter.total - counter.unread,
         "notifications": [notification.to_dict() for notification in notifications]
     }
 
+@notifications_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    user_id = get_jwt_identity()
+    
+    counter = get_notification_counter(user_id)
+    db.session.commit()
+    
+    return {
+        "status": "success",
+        "total": counter.total,
+        "unread_count": counter.unread
+    }
+
 @notifications_bp.route('/mark-read-all', methods=['POST'])
 @jwt_required()
 def mark_all_as_read():
     user_id = get_jwt_identity()
     
-    # Find all unread notifications
-    unread_notifications = Notification.query.filter_by(user_id=user_id, read_at=None).all()
+    # Mark all unread notifications as read with a single UPDATE
+    count = mark_all_notifications_read(user_id)
     
-    count = len(unread_notifications)
+    db.session.commit()
     
-    # Mark all as read
-    for notification in unread_notifications:
-        notification.read_at = datetime.utcnow()
+    return {
+        "status": "success",
+        "message": "All notifications marked as read",
+        "count": count
+    }
+
+def parse_bulk_selection(data):
+    """Read the `ids` / `before` selection shared by the bulk endpoints"""
+    ids = data.get('ids')
+    before = data.get('before')
+    
+    if ids is None and before is None:
+        return None, None, "Either ids or before is required"
+    
+    if ids is not None:
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return None, None, "ids must be an array of integers"
+        if len(ids) > current_app.config['NOTIFICATION_BULK_MAX_IDS']:
+            return None, None, f"At most {current_app.config['NOTIFICATION_BULK_MAX_IDS']} ids per request"
+    
+    if before is not None:
+        try:
+            before = datetime.fromisoformat(before)
+        except (TypeError, ValueError):
+            return None, None, "before must be an ISO 8601 timestamp"
+    
+    return ids, before, None
+
+@notifications_bp.route('/bulk/read', methods=['POST'])
+@jwt_required()
+def bulk_mark_read():
+    user_id = get_jwt_identity()
+    ids, before, error = parse_bulk_selection(request.get_json() or {})
     
+    if error:
+        return {"status": "error", "message": error}, 400
+    
+    count = mark_notifications_read(user_id, ids=ids, before=before)
     db.session.commit()
     
     return {
         "status": "success",
-        "message": "All notifications marked as read",
+        "message": "Notifications marked as read",
+        "count": count
+    }
+
+@notifications_bp.route('/bulk/delete', methods=['POST'])
+@jwt_required()
+def bulk_delete():
+    user_id = get_jwt_identity()
+    ids, before, error = parse_bulk_selection(request.get_json() or {})
+    
+    if error:
+        return {"status": "error", "message": error}, 400
+    
+    count = delete_notifications(user_id, ids=ids, before=before)
+    db.session.commit()
+    
+    return {
+        "status": "success",
+        "message": "Notifications deleted",
         "count": count
     }
 
@@ -69,7 +140,7 @@ def mark_notification_read(id):
     if not notification:
         return {"status": "error", "message": "Notification not found"}, 404
     
-    notification.read_at = datetime.utcnow()
+    read_notification(notification)
     db.session.commit()
     
     return {
@@ -88,10 +159,52 @@ def delete_notification(id):
     if not notification:
         return {"status": "error", "message": "Notification not found"}, 404
     
-    db.session.delete(notification)
+    remove_notification(notification)
     db.session.commit()
     
     return {
         "status": "success",
         "message": "Notification deleted"
-    }
\ No newline at end of file
+    }
+
+# WebSocket event handlers
+@socketio.on('notification_ack')
+def handle_notification_ack(data):
+    user_id = session.get('user_id')
+    ids = data.get('ids') or []
+    
+    if not user_id:
+        return {"status": "error", "message": "Not authenticated"}
+    
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        return {"status": "error", "message": "ids must be an array of integers"}
+    
+    count = acknowledge_notifications(user_id, ids)
+    db.session.commit()
+    
+    return {"status": "success", "count": count}
+
+@socketio.on('notification_sync')
+def handle_notification_sync(data):
+    """Replay unacked notifications newer than the client's cursor after a reconnect"""
+    user_id = session.get('user_id')
+    cursor = (data or {}).get('cursor')
+    
+    if not user_id:
+        return {"status": "error", "message": "Not authenticated"}
+    
+    since = None
+    if cursor:
+        try:
+            since = datetime.fromisoformat(cursor)
+        except (TypeError, ValueError):
+            return {"status": "error", "message": "cursor must be an ISO 8601 timestamp"}
+    
+    notifications = get_undelivered_notifications(user_id, since=since)
+    
+    return {
+        "status": "success",
+        "notifications": [notification.to_dict() for notification in notifications],
+        # Pass back as `cursor` on the next sync
+        "cursor": notifications[-1].created_at.isoformat() if notifications else cursor
+    }
@@ -1,40 +1,91 @@
-from flask import Blueprint, request, jsonify, send_file, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.utils import secure_filename
-import os
-from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user, create_access_token
+from sqlalchemy.orm import selectinload
 import bcrypt
 
 from app import db
-from backend.models.user import User
+from backend.models.user import User, DEFAULT_PRIVACY_SETTINGS
 from backend.models.credential import Credential
-from backend.models.schedule import Schedule
+from backend.models.schedule import Schedule, parse_time
+from backend.services.image_service import schedule_profile_image_processing
+from backend.services.resume_service import schedule_resume_processing
+from backend.services.reward_service import get_user_points
+from backend.services.revocation_service import revoke_user_tokens
+from backend.services.skill_service import set_user_skills, split_skills
+from backend.services.user_cache_service import load_user
+from backend.services.storage_service import (
+    save_upload, release_upload, send_stored_file, RESUMES, CREDENTIALS, PROFILE_IMAGES
+)
 
 profile_bp = Blueprint('profile', __name__)
 
 @profile_bp.route('', methods=['GET'])
 @jwt_required()
 def get_profile():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     return {
         "status": "success",
         "user": user.get_full_profile()
     }
 
-@profile_bp.route('/edit', methods=['PUT'])
+PROFILE_OVERVIEW_FIELDS = ('profile', 'credentials', 'schedule', 'rewards', 'notification_preferences', 'privacy_settings')
+
+@profile_bp.route('/overview', methods=['GET'])
 @jwt_required()
-def edit_profile():
+def get_profile_overview():
+    """
+    Everything the profile screen needs in one call
+    
+    `fields` (comma-separated) limits the sections returned. The user and its
+    credentials and schedules are loaded with selectinload, and the reward
+    totals are the user's running sums, so this is a fixed handful of queries.
+    """
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    requested = request.args.get('fields')
+    fields = set(PROFILE_OVERVIEW_FIELDS) if not requested else {f.strip() for f in requested.split(',')}
+    
+    unknown = fields - set(PROFILE_OVERVIEW_FIELDS)
+    if unknown:
+        return {"status": "error", "message": f"Unknown fields: {', '.join(sorted(unknown))}"}, 400
+    
+    options = []
+    if 'credentials' in fields:
+        options.append(selectinload(User.credentials))
+    if 'schedule' in fields:
+        options.append(selectinload(User.schedules))
+    
+    user = User.query.options(*options).filter_by(id=user_id).first()
     
     if not user:
         return {"status": "error", "message": "User not found"}, 404
     
+    result = {"status": "success"}
+    
+    if 'profile' in fields:
+        result['user'] = user.get_full_profile()
+    if 'credentials' in fields:
+        result['credentials'] = [credential.to_dict() for credential in user.credentials]
+    if 'schedule' in fields:
+        result['schedules'] = [schedule.to_dict() for schedule in user.schedules]
+    if 'rewards' in fields:
+        user_points = get_user_points(user.id)
+        result['rewards'] = {"total_points": user_points.points, "total_entries": user_points.entries}
+    if 'notification_preferences' in fields:
+        result['notification_preferences'] = user.get_notification_preferences()
+    if 'privacy_settings' in fields:
+        result['privacy_settings'] = user.privacy_settings or DEFAULT_PRIVACY_SETTINGS
+    
+    # Persist the reward totals if they were just backfilled
+    db.session.commit()
+    
+    return result
+
+@profile_bp.route('/edit', methods=['PUT'])
+@jwt_required()
+def edit_profile():
+    user = current_user
+    
     data = request.get_json()
     
     # Update fields that are provided
@@ -45,12 +96,14 @@ def edit_profile():
         user.bio = data['bio']
     
     if 'skills' in data:
-        user.skills = data['skills']
+        # Keep the display string and the normalized skill index in step
+        user.skills = ','.join(split_skills(data['skills']))
+        set_user_skills(user, data['skills'])
     
     if 'email' in data and data['email'] != user.email:
         # Check if email is already in use
         existing_user = User.query.filter_by(email=data['email']).first()
-        if existing_user and existing_user.id != user_id:
+        if existing_user and existing_user.id != user.id:
             return {"status": "error", "message": "Email already in use"}, 400
         
         user.email = data['email']
@@ -66,29 +119,22 @@ def edit_profile():
 @profile_bp.route('/resume', methods=['GET'])
 @jwt_required()
 def download_resume():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_user
     
-    if not user or not user.resume_url:
+    if not user.resume_url:
         return {"status": "error", "message": "Resume not found"}, 404
     
-    # In a real application, this might be a URL to a cloud storage service
-    # or a path to a local file
-    resume_path = os.path.join(current_app.config['RESUME_UPLOAD_FOLDER'], user.resume_url)
+    response = send_stored_file(RESUMES, user.resume_url)
     
-    if not os.path.exists(resume_path):
+    if response is None:
         return {"status": "error", "message": "Resume file not found"}, 404
     
-    return send_file(resume_path, as_attachment=True)
+    return response
 
 @profile_bp.route('/resume/upload', methods=['POST'])
 @jwt_required()
 def upload_resume():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     if 'resume' not in request.files:
         return {"status": "error", "message": "No file part"}, 400
@@ -103,18 +149,27 @@ def upload_resume():
     if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
         return {"status": "error", "message": "File type not allowed"}, 400
     
-    # Make sure upload directory exists
-    os.makedirs(current_app.config['RESUME_UPLOAD_FOLDER'], exist_ok=True)
-    
-    # Save file with secure filename
-    filename = secure_filename(f"{user_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}")
-    file_path = os.path.join(current_app.config['RESUME_UPLOAD_FOLDER'], filename)
-    file.save(file_path)
-    
-    # Update user's resume URL
+    # Store the file by content hash; identical uploads share one blob
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    filename = save_upload(file.stream, RESUMES, extension, content_type=file.mimetype)
+    
+    if user.resume_url == filename:
+        # Same resume again: nothing to redo
+        release_upload(RESUMES, filename)
+        db.session.commit()
+        return {
+            "status": "success",
+            "message": "Resume uploaded successfully",
+            "resume_url": filename
+        }
+    
+    # Update user's resume URL; the candidate search index is refreshed in the background
+    release_upload(RESUMES, user.resume_url)
     user.resume_url = filename
     db.session.commit()
     
+    schedule_resume_processing(user.id, filename)
+    
     return {
         "status": "success",
         "message": "Resume uploaded successfully",
@@ -124,11 +179,7 @@ def upload_resume():
 @profile_bp.route('/credentials', methods=['POST'])
 @jwt_required()
 def upload_credential():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     if 'credential' not in request.files:
         return {"status": "error", "message": "No file part"}, 400
@@ -152,17 +203,13 @@ def upload_credential():
     if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
         return {"status": "error", "message": "File type not allowed"}, 400
     
-    # Make sure upload directory exists
-    os.makedirs(current_app.config['CREDENTIAL_UPLOAD_FOLDER'], exist_ok=True)
-    
-    # Save file with secure filename
-    filename = secure_filename(f"{user_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}")
-    file_path = os.path.join(current_app.config['CREDENTIAL_UPLOAD_FOLDER'], filename)
-    file.save(file_path)
+    # Store the file by content hash; identical uploads share one blob
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    filename = save_upload(file.stream, CREDENTIALS, extension, content_type=file.mimetype)
     
     # Create credential record
     credential = Credential(
-        user_id=user_id,
+        user_id=user.id,
         title=title,
         description=description,
         credential_type=credential_type,
@@ -191,6 +238,24 @@ def get_credentials():
         "credentials": [credential.to_dict() for credential in credentials]
     }
 
+@profile_bp.route('/credentials/<int:id>/file', methods=['GET'])
+@jwt_required()
+def download_credential(id):
+    user_id = get_jwt_identity()
+    
+    # Find credential and ensure it belongs to user
+    credential = Credential.query.filter_by(id=id, user_id=user_id).first()
+    
+    if not credential or not credential.file_url:
+        return {"status": "error", "message": "Credential not found"}, 404
+    
+    response = send_stored_file(CREDENTIALS, credential.file_url)
+    
+    if response is None:
+        return {"status": "error", "message": "Credential file not found"}, 404
+    
+    return response
+
 @profile_bp.route('/schedule', methods=['GET'])
 @jwt_required()
 def get_schedule():
@@ -212,10 +277,8 @@ def update_schedule():
     if not isinstance(data, list):
         return {"status": "error", "message": "Schedule data must be an array"}, 400
     
-    # Delete existing schedules
-    Schedule.query.filter_by(user_id=user_id).delete()
-    
-    # Create new schedules
+    # Validate everything before touching the database
+    incoming = {}
     for schedule_data in data:
         day_of_week = schedule_data.get('day_of_week')
         start_time = schedule_data.get('start_time')
@@ -225,14 +288,35 @@ def update_schedule():
         if day_of_week is None or start_time is None or end_time is None:
             return {"status": "error", "message": "Each schedule must have day_of_week, start_time, and end_time"}, 400
         
-        schedule = Schedule(
-            user_id=user_id,
-            day_of_week=day_of_week,
-            start_time=start_time,
-            end_time=end_time,
-            availability=availability
-        )
-        db.session.add(schedule)
+        if day_of_week not in range(7):
+            return {"status": "error", "message": "day_of_week must be between 0 (Monday) and 6 (Sunday)"}, 400
+        
+        if parse_time(start_time) is None or parse_time(end_time) is None:
+            return {"status": "error", "message": "start_time and end_time must be in HH:MM format"}, 400
+        
+        if day_of_week in incoming:
+            return {"status": "error", "message": f"Duplicate schedule for day {day_of_week}"}, 400
+        
+        incoming[day_of_week] = (start_time, end_time, availability)
+    
+    # Only write the days that actually changed
+    existing = {schedule.day_of_week: schedule for schedule in Schedule.query.filter_by(user_id=user_id)}
+    
+    for day_of_week, schedule in existing.items():
+        if day_of_week not in incoming:
+            db.session.delete(schedule)
+    
+    for day_of_week, (start_time, end_time, availability) in incoming.items():
+        schedule = existing.get(day_of_week)
+        
+        if schedule is None:
+            schedule = Schedule(user_id=user_id, day_of_week=day_of_week)
+            db.session.add(schedule)
+        elif (schedule.start_time, schedule.end_time, schedule.availability) == (start_time, end_time, availability):
+            continue
+        
+        schedule.set_hours(start_time, end_time)
+        schedule.availability = availability
     
     db.session.commit()
     
@@ -244,11 +328,7 @@ def update_schedule():
 @profile_bp.route('/change-password', methods=['POST'])
 @jwt_required()
 def change_password():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     data = request.get_json()
     current_password = data.get('current_password')
@@ -261,23 +341,21 @@ def change_password():
     if not user.check_password(current_password):
         return {"status": "error", "message": "Current password is incorrect"}, 400
     
-    # Update password
+    # Update password and sign out every other session; this one gets a fresh token
     user.set_password(new_password)
+    revoke_user_tokens(user.id)
     db.session.commit()
     
     return {
         "status": "success",
-        "message": "Password changed successfully"
+        "message": "Password changed successfully",
+        "token": create_access_token(identity=str(user.id))
     }
 
 @profile_bp.route('/profile-image', methods=['POST'])
 @jwt_required()
 def upload_profile_image():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     if 'image' not in request.files:
         return {"status": "error", "message": "No file part"}, 400
@@ -292,20 +370,59 @@ def upload_profile_image():
     if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
         return {"status": "error", "message": "File type not allowed"}, 400
     
-    # Make sure upload directory exists
-    os.makedirs(current_app.config['PROFILE_IMAGES_FOLDER'], exist_ok=True)
-    
-    # Save file with secure filename
-    filename = secure_filename(f"{user_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}")
-    file_path = os.path.join(current_app.config['PROFILE_IMAGES_FOLDER'], filename)
-    file.save(file_path)
-    
-    # Update user's profile image
+    # Store the file by content hash; identical uploads share one blob
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    filename = save_upload(file.stream, PROFILE_IMAGES, extension, content_type=file.mimetype)
+    
+    if user.profile_image == filename:
+        # Same image again: nothing to redo
+        release_upload(PROFILE_IMAGES, filename)
+        db.session.commit()
+        return {
+            "status": "success",
+            "message": "Profile image uploaded successfully",
+            "profile_image": filename
+        }
+    
+    # Update user's profile image; thumbnails are generated in the background
+    release_upload(PROFILE_IMAGES, user.profile_image)
     user.profile_image = filename
+    user.profile_image_renditions = None
     db.session.commit()
     
+    schedule_profile_image_processing(user.id, filename)
+    
     return {
         "status": "success",
         "message": "Profile image uploaded successfully",
         "profile_image": filename
-    }
\ No newline at end of file
+    }
+
+@profile_bp.route('/profile-image', methods=['GET'])
+@jwt_required()
+def get_profile_image():
+    """Serve a user's profile image at the size the client needs (e.g. ?size=64&format=webp)"""
+    user_id = request.args.get('user_id', type=int) or get_jwt_identity()
+    size = request.args.get('size', type=int)
+    image_format = request.args.get('format', 'jpeg')
+    user = load_user(user_id)
+    
+    if not user or not user.profile_image:
+        return {"status": "error", "message": "Profile image not found"}, 404
+    
+    if image_format not in current_app.config['PROFILE_IMAGE_FORMATS']:
+        return {"status": "error", "message": "Unsupported image format"}, 400
+    
+    filename = user.get_profile_image(size, image_format)
+    
+    # Only the re-encoded renditions are metadata-free; the uploaded original
+    # (EXIF, GPS) is never served to anyone but its owner
+    if filename == user.profile_image and user.id != int(get_jwt_identity()):
+        return {"status": "error", "message": "Profile image not found"}, 404
+    
+    response = send_stored_file(PROFILE_IMAGES, filename, as_attachment=False, max_age=86400)
+    
+    if response is None:
+        return {"status": "error", "message": "Profile image file not found"}, 404
+    
+    return response
\ No newline at end of file
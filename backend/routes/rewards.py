@@ -1,10 +1,12 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
 
 from app import db
 from backend.models.reward import Reward
-from backend.models.user import User
+from backend.services.reward_service import (
+    award_points, get_points_leaderboard, get_user_points, get_user_rank,
+    get_window_leaderboard, get_user_window_rank, LEADERBOARD_WINDOWS
+)
 
 rewards_bp = Blueprint('rewards', __name__)
 
@@ -15,13 +17,8 @@ def get_rewards():
     page = int(request.args.get('page', 1))
     limit = int(request.args.get('limit', 20))
     
-    # Get total points for this user
-    total_points = db.session.query(func.sum(Reward.points))\
-        .filter_by(user_id=user_id)\
-        .scalar() or 0
-    
-    # Get total entries count
-    total_entries = Reward.query.filter_by(user_id=user_id).count()
+    # Totals come from the running per-user sums instead of aggregating every reward
+    user_points = get_user_points(user_id)
     
     # Get rewards with pagination
     rewards = Reward.query.filter_by(user_id=user_id)\
@@ -30,10 +27,13 @@ def get_rewards():
         .limit(limit)\
         .all()
     
+    # Persist the totals if they were just backfilled
+    db.session.commit()
+    
     return {
         "status": "success",
-        "total_points": total_points,
-        "total_entries": total_entries,
+        "total_points": user_points.points,
+        "total_entries": user_points.entries,
         "page": page,
         "limit": limit,
         "rewards": [reward.to_dict() for reward in rewards]
@@ -66,15 +66,8 @@ def add_reward():
     except ValueError:
         return {"status": "error", "message": "Points must be a positive integer"}, 400
     
-    # Create reward record
-    reward = Reward(
-        user_id=user_id,
-        action=action,
-        points=points,
-        description=description
-    )
-    
-    db.session.add(reward)
+    # Create reward record (and update the user's running total)
+    reward = award_points(int(user_id), points, action, description)
     db.session.commit()
     
     return {
@@ -85,31 +78,38 @@ def add_reward():
 
 @rewards_bp.route('/leaderboard', methods=['GET'])
 def get_leaderboard():
-    """Get a leaderboard of users with the most points"""
-    # This is a simplified implementation
-    # In a real application, you might want to cache this result
-    # or calculate it periodically to improve performance
-    
-    # Query for top 10 users by total points
-    leaderboard = db.session.query(
-        Reward.user_id,
-        func.sum(Reward.points).label('total_points')
-    ).group_by(Reward.user_id)\
-    .order_by(func.sum(Reward.points).desc())\
-    .limit(10)\
-    .all()
+    """Get a leaderboard of users with the most points, all-time or over a window"""
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    window = request.args.get('window', 'all')
     
-    # Get user names (fixed version)
-    result = []
-    for user_id, total_points in leaderboard:
-        user = User.query.get(user_id)
-        result.append({
-            "user_id": user_id,
-            "name": user.name if user and user.name else f"User {user_id}",
-            "total_points": total_points
-        })
+    if window == 'all':
+        leaderboard = get_points_leaderboard(limit)
+    elif window in LEADERBOARD_WINDOWS:
+        leaderboard = get_window_leaderboard(window, limit)
+    else:
+        return {"status": "error", "message": f"window must be one of: all, {', '.join(LEADERBOARD_WINDOWS)}"}, 400
     
     return {
         "status": "success",
-        "leaderboard": result
-    }
\ No newline at end of file
+        "window": window,
+        "leaderboard": leaderboard
+    }
+
+@rewards_bp.route('/rank', methods=['GET'])
+@jwt_required()
+def get_my_rank():
+    """The current user's points and leaderboard position"""
+    user_id = int(get_jwt_identity())
+    window = request.args.get('window', 'all')
+    
+    if window == 'all':
+        rank = get_user_rank(user_id)
+    elif window in LEADERBOARD_WINDOWS:
+        rank = get_user_window_rank(user_id, window)
+    else:
+        return {"status": "error", "message": f"window must be one of: all, {', '.join(LEADERBOARD_WINDOWS)}"}, 400
+    
+    # Persist the totals if they were just backfilled
+    db.session.commit()
+    
+    return {"status": "success", **rank}
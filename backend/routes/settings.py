@@ -1,19 +1,17 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, current_user
 
 from app import db
-from backend.models.user import User
+from backend.models.user import DEFAULT_NOTIFICATION_PREFERENCES, DEFAULT_PRIVACY_SETTINGS
+from backend.services.revocation_service import revoke_user_tokens
+from backend.services.storage_service import release_user_uploads
 
 settings_bp = Blueprint('settings', __name__)
 
 @settings_bp.route('/account/delete', methods=['DELETE'])
 @jwt_required()
 def delete_account():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     data = request.get_json()
     password = data.get('password')
@@ -30,7 +28,10 @@ def delete_account():
     if not user.check_password(password):
         return {"status": "error", "message": "Incorrect password"}, 400
     
-    # Delete user account
+    # Delete user account; its tokens stop working immediately and its
+    # uploads become garbage unless other users share them
+    revoke_user_tokens(user.id)
+    release_user_uploads(user)
     db.session.delete(user)
     db.session.commit()
     
@@ -42,21 +43,10 @@ def delete_account():
 @settings_bp.route('/notifications', methods=['GET'])
 @jwt_required()
 def get_notification_preferences():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
-    
-    # Default preferences if not set
-    preferences = user.notification_preferences or {
-        "email_notifications": True,
-        "push_notifications": True,
-        "sms_notifications": True,
-        "job_alerts": True,
-        "message_notifications": True,
-        "application_updates": True
-    }
+    user = current_user
+    
+    # Defaults for anything not set
+    preferences = user.get_notification_preferences()
     
     return {
         "status": "success",
@@ -66,28 +56,19 @@ def get_notification_preferences():
 @settings_bp.route('/notifications', methods=['PUT'])
 @jwt_required()
 def update_notification_preferences():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     data = request.get_json()
     
     # Validate preferences
-    required_prefs = [
-        "email_notifications", "push_notifications", "sms_notifications", 
-        "job_alerts", "message_notifications", "application_updates"
-    ]
-    
-    for pref in required_prefs:
+    for pref in DEFAULT_NOTIFICATION_PREFERENCES:
         if pref not in data:
             return {"status": "error", "message": f"Missing preference: {pref}"}, 400
         if not isinstance(data[pref], bool):
             return {"status": "error", "message": f"Preference {pref} must be a boolean"}, 400
     
-    # Update preferences
-    user.notification_preferences = data
+    # Update preferences (and the bitmask used for fan-out filtering)
+    user.set_notification_preferences(data)
     db.session.commit()
     
     return {
@@ -99,19 +80,10 @@ def update_notification_preferences():
 @settings_bp.route('/privacy', methods=['GET'])
 @jwt_required()
 def get_privacy_settings():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     # Default settings if not set
-    settings = user.privacy_settings or {
-        "profile_visibility": "public",
-        "resume_visibility": "connections",
-        "contact_info_visibility": "connections",
-        "job_application_visibility": "private"
-    }
+    settings = user.privacy_settings or DEFAULT_PRIVACY_SETTINGS
     
     return {
         "status": "success",
@@ -121,23 +93,14 @@ def get_privacy_settings():
 @settings_bp.route('/privacy', methods=['PUT'])
 @jwt_required()
 def update_privacy_settings():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    
-    if not user:
-        return {"status": "error", "message": "User not found"}, 404
+    user = current_user
     
     data = request.get_json()
     
     # Validate settings
-    required_settings = [
-        "profile_visibility", "resume_visibility", 
-        "contact_info_visibility", "job_application_visibility"
-    ]
-    
     valid_visibilities = ["public", "connections", "private"]
     
-    for setting in required_settings:
+    for setting in DEFAULT_PRIVACY_SETTINGS:
         if setting not in data:
             return {"status": "error", "message": f"Missing setting: {setting}"}, 400
         if data[setting] not in valid_visibilities:
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from flask import current_app
+
+from app import db
+from backend.models.message import Message, MessageArchive
+
+def archive_old_messages(older_than_days=None, segment_size=None):
+    """
+    Move messages older than the configured age out of the hot Message table
+    into compressed per-conversation MessageArchive segments
+    
+    Returns a dict with the number of segments written and messages moved
+    """
+    older_than_days = older_than_days or current_app.config['MESSAGE_ARCHIVE_AFTER_DAYS']
+    segment_size = segment_size or current_app.config['MESSAGE_ARCHIVE_SEGMENT_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    
+    conversation_ids = [
+        row[0] for row in db.session.query(Message.conversation_id)
+        .filter(Message.created_at < cutoff)
+        .distinct()
+        .all()
+    ]
+    
+    segments = 0
+    archived = 0
+    for conversation_id in conversation_ids:
+        while True:
+            # Each segment is committed on its own so a long run never holds big locks
+            messages = Message.query.filter(
+                Message.conversation_id == conversation_id,
+                Message.created_at < cutoff
+            ).order_by(Message.id).limit(segment_size).all()
+            
+            if not messages:
+                break
+            
+            archive = MessageArchive(
+                conversation_id=conversation_id,
+                first_message_id=messages[0].id,
+                last_message_id=messages[-1].id,
+                first_created_at=messages[0].created_at,
+                last_created_at=messages[-1].created_at,
+                message_count=len(messages),
+                payload=MessageArchive.compress([msg.to_dict() for msg in messages])
+            )
+            db.session.add(archive)
+            
+            Message.query.filter(Message.id.in_([msg.id for msg in messages]))\
+                .delete(synchronize_session=False)
+            db.session.commit()
+            
+            segments += 1
+            archived += len(messages)
+            
+            if len(messages) < segment_size:
+                break
+    
+    return {"segments": segments, "messages": archived}
+
+def get_conversation_messages(conversation_id, before_id=None, limit=None):
+    """
+    Return (messages, has_more) for a conversation, oldest first
+    
+    Without a cursor or limit this returns the whole hot window, as before.
+    With `before_id`/`limit` it pages backwards and transparently continues
+    into the archived segments once the hot table runs out.
+    """
+    if before_id is None and limit is None:
+        messages = Message.query.filter_by(conversation_id=conversation_id)\
+            .order_by(Message.created_at)\
+            .all()
+        oldest_id = messages[0].id if messages else None
+        return [msg.to_dict() for msg in messages], _has_older(conversation_id, oldest_id)
+    
+    limit = limit or current_app.config['MESSAGE_PAGE_SIZE']
+    
+    query = Message.query.filter_by(conversation_id=conversation_id)
+    if before_id is not None:
+        query = query.filter(Message.id < before_id)
+    hot = query.order_by(Message.id.desc()).limit(limit).all()
+    
+    # Newest first while collecting, reversed at the end
+    result = [msg.to_dict() for msg in hot]
+    cursor = hot[-1].id if hot else before_id
+    
+    if len(result) < limit:
+        archives = MessageArchive.query.filter_by(conversation_id=conversation_id)
+        if cursor is not None:
+            archives = archives.filter(MessageArchive.first_message_id < cursor)
+        
+        for archive in archives.order_by(MessageArchive.last_message_id.desc()):
+            for data in reversed(archive.get_messages()):
+                if cursor is not None and data['id'] >= cursor:
+                    continue
+                result.append(data)
+                if len(result) >= limit:
+                    break
+            if len(result) >= limit:
+                break
+    
+    result.reverse()
+    oldest_id = result[0]['id'] if result else before_id
+    return result, _has_older(conversation_id, oldest_id)
+
+def _has_older(conversation_id, message_id):
+    """Check whether anything older than `message_id` exists, hot or archived"""
+    hot = Message.query.filter_by(conversation_id=conversation_id)
+    archived = MessageArchive.query.filter_by(conversation_id=conversation_id)
+    
+    if message_id is not None:
+        hot = hot.filter(Message.id < message_id)
+        archived = archived.filter(MessageArchive.first_message_id < message_id)
+    
+    return db.session.query(hot.exists()).scalar() or db.session.query(archived.exists()).scalar()
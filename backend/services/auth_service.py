@@ -1,10 +1,11 @@
 import random
 import string
-from datetime import datetime, timedelta
+from flask import current_app
 
-# In production, use a proper storage like Redis
-# This is simplified for demonstration
-otp_store = {}  # phone_number -> (otp, expiry)
+from backend.services.kv_service import get_kv_store
+
+def otp_key(phone_number):
+    return f"otp:{phone_number}"
 
 def generate_otp(length=6):
     """Generate a random OTP of the specified length"""
@@ -16,8 +17,9 @@ def send_otp(phone_number):
     In a real application, this would integrate with an SMS service provider
     """
     otp = generate_otp()
-    expiry = datetime.utcnow() + timedelta(minutes=10)
-    otp_store[phone_number] = (otp, expiry)
+    
+    # Kept in the shared store so any worker can verify it; expires on its own
+    get_kv_store().set(otp_key(phone_number), otp, current_app.config['OTP_TTL_SECONDS'])
     
     # In production: Send the OTP via an SMS service
     print(f"OTP for {phone_number}: {otp}")
@@ -26,19 +28,8 @@ def send_otp(phone_number):
 
 def verify_otp(phone_number, otp):
     """Verify if the provided OTP is valid for the phone number"""
-    if phone_number not in otp_store:
-        return False
-    
-    stored_otp, expiry = otp_store[phone_number]
-    
-    if datetime.utcnow() > expiry:
-        # OTP expired
-        del otp_store[phone_number]
-        return False
-    
-    if otp != stored_otp:
+    if not otp:
         return False
     
-    # OTP verified successfully, remove it from store
-    del otp_store[phone_number]
-    return True
+    # Checked and consumed in one atomic step, so an OTP can only be used once
+    return get_kv_store().delete_if_equals(otp_key(phone_number), str(otp))
@@ -0,0 +1,20 @@
+from app import db
+from backend.models.checkpoint import JobCheckpoint
+
+def get_checkpoint(name):
+    """Last position recorded for a job, 0 when it has not started"""
+    checkpoint = JobCheckpoint.query.get(name)
+    return checkpoint.position if checkpoint else 0
+
+def save_checkpoint(name, position):
+    """Record progress; commit it together with the batch it covers"""
+    checkpoint = JobCheckpoint.query.get(name)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(name=name)
+        db.session.add(checkpoint)
+    checkpoint.position = position
+
+def clear_checkpoints(prefix):
+    """Forget every checkpoint of a job once a run has finished"""
+    JobCheckpoint.query.filter(JobCheckpoint.name.startswith(prefix))\
+        .delete(synchronize_session=False)
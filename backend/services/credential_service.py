@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, insert
+
+from app import db
+from backend.models.credential import Credential, CredentialReminder
+from backend.services.checkpoint_service import get_checkpoint, save_checkpoint, clear_checkpoints
+from backend.services.notification_service import send_notification
+
+CHECKPOINT_PREFIX = 'credential_expiry'
+NOTIFICATION_TYPE = 'credential_expiry'
+
+def reminder_windows(reminder_days, now):
+    """
+    (days_before, start, end) expiry windows, nearest reminder first
+    
+    Windows don't overlap, so a credential that is already inside the 7 day
+    window only gets the 7 day reminder, not the 30 day one as well.
+    """
+    windows = []
+    start = now
+    for days in sorted(reminder_days):
+        end = now + timedelta(days=days)
+        windows.append((days, start, end))
+        start = end
+    return windows
+
+def remind_expiring_credentials(batch_size=None, now=None):
+    """
+    Notify users whose credentials are about to expire (run daily)
+    
+    Credentials are scanned through the expiry_date index in id order, one
+    batch per transaction: the reminder markers are written in bulk and the
+    notifications sent through send_notification (so preferences and
+    coalescing apply and online users get a push), then everything is
+    committed with a checkpoint, so a crashed run resumes where it stopped
+    and a rerun sends nothing twice. Users who switched the reminders off
+    still get the marker, so they aren't rescanned. Returns the number of
+    reminders sent per window.
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config['CREDENTIAL_REMINDER_BATCH_SIZE']
+    run_prefix = f"{CHECKPOINT_PREFIX}:{now.date().isoformat()}"
+    
+    sent = {}
+    for days, start, end in reminder_windows(current_app.config['CREDENTIAL_EXPIRY_REMINDER_DAYS'], now):
+        checkpoint = f"{run_prefix}:{days}"
+        last_id = get_checkpoint(checkpoint)
+        sent[days] = 0
+        
+        while True:
+            rows = db.session.query(
+                Credential.id, Credential.user_id, Credential.title, Credential.expiry_date
+            ).outerjoin(CredentialReminder, and_(
+                CredentialReminder.credential_id == Credential.id,
+                CredentialReminder.expiry_date == Credential.expiry_date,
+                CredentialReminder.days_before == days
+            )).filter(
+                Credential.expiry_date > start,
+                Credential.expiry_date <= end,
+                CredentialReminder.credential_id == None,
+                Credential.id > last_id
+            ).order_by(Credential.id).limit(batch_size).all()
+            
+            if not rows:
+                break
+            
+            db.session.execute(insert(CredentialReminder), [
+                {"credential_id": row.id, "expiry_date": row.expiry_date, "days_before": days,
+                 "created_at": datetime.utcnow()}
+                for row in rows
+            ])
+            
+            for row in rows:
+                notification = send_notification(
+                    user_id=row.user_id,
+                    title="Credential Expiring",
+                    message=f"Your credential \"{row.title}\" expires on {row.expiry_date.date().isoformat()}",
+                    notification_type=NOTIFICATION_TYPE,
+                    related_id=row.id
+                )
+                if notification is not None:
+                    sent[days] += 1
+            
+            last_id = rows[-1].id
+            save_checkpoint(checkpoint, last_id)
+            db.session.commit()
+    
+    # Finished: drop this run's checkpoints (and any left by an abandoned run)
+    clear_checkpoints(CHECKPOINT_PREFIX)
+    db.session.commit()
+    
+    return sent
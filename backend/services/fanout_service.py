@@ -0,0 +1,57 @@
+import threading
+from flask import current_app
+
+from app import socketio
+
+# Bursts waiting to be flushed: (event, namespace, rooms) -> [payload, ...]
+# Kept per worker; the flushed emit reaches other nodes through the Socket.IO
+# message queue (REDIS_URL), without which only this worker's sockets get it
+pending_batches = {}
+pending_lock = threading.Lock()
+
+def emit_to_rooms(event, data, rooms, namespace='/'):
+    """
+    Emit an event once to the union of the sockets in `rooms`
+    
+    All rooms go into a single emit, so the Socket.IO manager resolves the
+    union of their sids (a socket that is in several of the rooms gets one
+    copy) and encodes the packet once for every recipient.
+    
+    When SOCKETIO_COALESCE_WINDOW_MS is set, emits to the same rooms within
+    the window are coalesced into one `<event>_batch` frame carrying a list
+    of payloads. A burst of one is still sent as a plain `<event>`.
+    """
+    rooms = sorted(set(rooms))
+    window = current_app.config.get('SOCKETIO_COALESCE_WINDOW_MS', 0)
+    
+    if not window:
+        socketio.emit(event, data, to=rooms, namespace=namespace)
+        return
+    
+    key = (event, namespace, tuple(rooms))
+    with pending_lock:
+        batch = pending_batches.get(key)
+        if batch is not None:
+            batch.append(data)
+            return
+        pending_batches[key] = [data]
+    
+    # First payload of a burst schedules the flush
+    socketio.start_background_task(flush_batch, key, window / 1000.0)
+
+def flush_batch(key, delay=0):
+    """Send everything buffered for `key` as a single frame"""
+    if delay:
+        socketio.sleep(delay)
+    
+    with pending_lock:
+        batch = pending_batches.pop(key, None)
+    
+    if not batch:
+        return
+    
+    event, namespace, rooms = key
+    if len(batch) == 1:
+        socketio.emit(event, batch[0], to=list(rooms), namespace=namespace)
+    else:
+        socketio.emit(f"{event}_batch", batch, to=list(rooms), namespace=namespace)
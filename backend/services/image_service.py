@@ -0,0 +1,90 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+from app import db, socketio
+from backend.services.storage_service import get_storage, storage_key, PROFILE_IMAGES
+
+# File extension and Pillow save options per output format
+IMAGE_FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+image_pool = None
+
+def get_image_pool():
+    """Process pool for image work, created on first use in each API process"""
+    global image_pool
+    if image_pool is None:
+        image_pool = ProcessPoolExecutor(max_workers=current_app.config['IMAGE_WORKERS'])
+    return image_pool
+
+def render_profile_image(data, sizes, formats):
+    """
+    Decode an uploaded image once and render square thumbnails
+    
+    Runs in a worker process. EXIF orientation is applied and all metadata
+    is dropped. Returns {(size, format): bytes}.
+    """
+    from PIL import Image, ImageOps
+    
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGB')
+        
+        # Centre-crop to a square once, then scale down from the largest size
+        side = min(image.size)
+        image = ImageOps.fit(image, (side, side), method=Image.LANCZOS)
+    
+    renditions = {}
+    for size in sorted(sizes, reverse=True):
+        thumbnail = image if side <= size else image.resize((size, size), Image.LANCZOS)
+        for name in formats:
+            _, options = IMAGE_FORMATS[name]
+            out = io.BytesIO()
+            # No exif= argument, so nothing from the original is carried over
+            thumbnail.save(out, **options)
+            renditions[(size, name)] = out.getvalue()
+        image = thumbnail
+    
+    return renditions
+
+def process_profile_image(app, user_id, filename):
+    """Generate and store the renditions for a freshly uploaded profile image"""
+    from backend.models.user import User
+    
+    with app.app_context():
+        storage = get_storage()
+        sizes = app.config['PROFILE_IMAGE_SIZES']
+        formats = app.config['PROFILE_IMAGE_FORMATS']
+        
+        with storage.open(storage_key(PROFILE_IMAGES, filename)) as original:
+            data = original.read()
+        
+        try:
+            renditions = get_image_pool().submit(render_profile_image, data, sizes, formats).result()
+        except Exception as e:
+            print(f"Error processing profile image {filename}: {e}")
+            return
+        
+        base = os.path.splitext(filename)[0]
+        stored = {}
+        for (size, name), content in renditions.items():
+            extension = IMAGE_FORMATS[name][0]
+            rendition = f"{base}_{size}.{extension}"
+            storage.save(io.BytesIO(content), storage_key(PROFILE_IMAGES, rendition),
+                         content_type=f"image/{name}")
+            stored.setdefault(str(size), {})[name] = rendition
+        
+        user = User.query.get(user_id)
+        # Skip if another upload replaced the image while this one was processing
+        if user and user.profile_image == filename:
+            user.profile_image_renditions = stored
+            db.session.commit()
+
+def schedule_profile_image_processing(user_id, filename):
+    """Queue rendition generation without blocking the request"""
+    app = current_app._get_current_object()
+    socketio.start_background_task(process_profile_image, app, user_id, filename)
@@ -0,0 +1,175 @@
+import threading
+import time
+import uuid
+from collections import deque
+from flask import current_app
+
+class MemoryStore:
+    """
+    Per-process TTL key-value store for development and single-worker runs
+    
+    Expired keys are never returned, and a background thread sweeps them out
+    every `sweep_interval` seconds so the dict does not grow without bound.
+    """
+    
+    def __init__(self, sweep_interval=60):
+        self.data = {}  # key -> (value, expires_at)
+        self.lock = threading.Lock()
+        self.sweep_interval = sweep_interval
+        
+        sweeper = threading.Thread(target=self.sweep_forever, daemon=True)
+        sweeper.start()
+    
+    def sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            self.sweep()
+    
+    def sweep(self):
+        """Remove every expired key"""
+        now = time.monotonic()
+        with self.lock:
+            expired = [key for key, (_, expires_at) in self.data.items() if expires_at <= now]
+            for key in expired:
+                del self.data[key]
+        return len(expired)
+    
+    def _live(self, key, now):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self.data[key]
+            return None
+        return entry[0]
+    
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + ttl)
+    
+    def get(self, key):
+        with self.lock:
+            return self._live(key, time.monotonic())
+    
+    def delete(self, key):
+        with self.lock:
+            return self.data.pop(key, None) is not None
+    
+    def delete_if_equals(self, key, value):
+        """Atomically delete `key` only if it currently holds `value`"""
+        with self.lock:
+            if self._live(key, time.monotonic()) != value:
+                return False
+            del self.data[key]
+            return True
+    
+    def hit(self, limits):
+        """
+        Record an attempt against several sliding windows at once
+        
+        `limits` is a list of (key, limit, window seconds). The attempt is
+        only recorded, in every window, when none of them is full. Returns
+        (allowed, retry_after).
+        """
+        with self.lock:
+            now = time.monotonic()
+            windows = []
+            for key, limit, window in limits:
+                hits = self._live(key, now) or deque()
+                while hits and hits[0] <= now - window:
+                    hits.popleft()
+                
+                if len(hits) >= limit:
+                    return False, hits[0] + window - now
+                windows.append((key, hits, window))
+            
+            for key, hits, window in windows:
+                hits.append(now)
+                self.data[key] = (hits, now + window)
+            return True, 0
+
+class RedisStore:
+    """TTL key-value store shared by every worker through Redis"""
+    
+    # GET + DEL in one step so two requests can't both consume the same value
+    DELETE_IF_EQUALS = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+    
+    # Sliding window logs in sorted sets scored by timestamp; ARGV holds
+    # now, the member to add, then a (limit, window) pair per key
+    HIT = """
+    local now = tonumber(ARGV[1])
+    for i, key in ipairs(KEYS) do
+        local limit = tonumber(ARGV[1 + 2 * i])
+        local window = tonumber(ARGV[2 + 2 * i])
+        redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+        if redis.call('ZCARD', key) >= limit then
+            local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+            return {0, tostring(tonumber(oldest[2]) + window - now)}
+        end
+    end
+    for i, key in ipairs(KEYS) do
+        local window = tonumber(ARGV[2 + 2 * i])
+        redis.call('ZADD', key, now, ARGV[2])
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+    end
+    return {1, '0'}
+    """
+    
+    def __init__(self, url, prefix='jobseeker:'):
+        import redis
+        
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.delete_if_equals_script = self.client.register_script(self.DELETE_IF_EQUALS)
+        self.hit_script = self.client.register_script(self.HIT)
+    
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+    
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+    
+    def delete(self, key):
+        return bool(self.client.delete(self.prefix + key))
+    
+    def delete_if_equals(self, key, value):
+        """Atomically delete `key` only if it currently holds `value`"""
+        return bool(self.delete_if_equals_script(keys=[self.prefix + key], args=[value]))
+    
+    def hit(self, limits):
+        """
+        Record an attempt against several sliding windows at once
+        
+        `limits` is a list of (key, limit, window seconds). The attempt is
+        only recorded, in every window, when none of them is full. Returns
+        (allowed, retry_after).
+        """
+        if not limits:
+            return True, 0
+        
+        now = time.time()
+        args = [now, f"{now}:{uuid.uuid4().hex}"]
+        for _, limit, window in limits:
+            args.extend([limit, window])
+        
+        allowed, retry_after = self.hit_script(keys=[self.prefix + key for key, _, _ in limits], args=args)
+        return bool(allowed), float(retry_after)
+
+def get_kv_store(app=None):
+    """Return the app's TTL store: Redis when REDIS_URL is set, else in-memory"""
+    app = app or current_app
+    store = app.extensions.get('kv_store')
+    
+    if store is None:
+        if app.config['REDIS_URL']:
+            store = RedisStore(app.config['REDIS_URL'])
+        else:
+            store = MemoryStore(sweep_interval=app.config['KV_SWEEP_INTERVAL_SECONDS'])
+        app.extensions['kv_store'] = store
+    
+    return store
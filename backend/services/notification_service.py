@@ -0,0 +1,262 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, event, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import db
+from backend.models.notification import Notification, NotificationCounter
+from backend.models.user import User
+from backend.services.fanout_service import emit_to_rooms
+
+def get_notification_counter(user_id):
+    """
+    Return the user's NotificationCounter, creating it on first use
+    
+    Users that predate the counter table are backfilled with a single
+    aggregate over their existing notifications.
+    """
+    counter = NotificationCounter.query.get(user_id)
+    if counter:
+        return counter
+    
+    # Count only what is already stored, not what is pending in this session
+    with db.session.no_autoflush:
+        total, unread = db.session.query(
+            func.count(Notification.id),
+            func.count(Notification.id).filter(Notification.read_at == None)
+        ).filter(Notification.user_id == user_id).one()
+    
+    counter = NotificationCounter(user_id=user_id, total=total, unread=unread)
+    try:
+        with db.session.begin_nested():
+            db.session.add(counter)
+    except IntegrityError:
+        # Another request created it first
+        counter = NotificationCounter.query.get(user_id)
+    
+    return counter
+
+def adjust_notification_counter(user_id, total=0, unread=0):
+    """Atomically apply deltas to a user's counter"""
+    get_notification_counter(user_id)
+    
+    NotificationCounter.query.filter_by(user_id=user_id).update({
+        NotificationCounter.total: NotificationCounter.total + total,
+        NotificationCounter.unread: NotificationCounter.unread + unread,
+        NotificationCounter.updated_at: datetime.utcnow()
+    }, synchronize_session='fetch')
+
+def create_notification(user_id, title, message, notification_type, related_id=None):
+    """Add a notification for a user; the caller commits"""
+    get_notification_counter(user_id)
+    
+    notification = Notification(
+        user_id=user_id,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        related_id=related_id
+    )
+    db.session.add(notification)
+    adjust_notification_counter(user_id, total=1, unread=1)
+    queue_notification_push(notification)
+    
+    return notification
+
+def notification_preference(notification_type):
+    """The preference that gates a notification type, or None if it is always sent"""
+    return current_app.config['NOTIFICATION_TYPE_PREFERENCES'].get(notification_type)
+
+def send_notification(user_id, title, message, notification_type, related_id=None):
+    """
+    Coalescing notification writer; the caller commits
+    
+    Nothing is sent (and None is returned) when the user has switched off
+    the preference for this type. For types listed in
+    NOTIFICATION_COALESCE_RULES the user keeps a single unread notification
+    per (type, related_id): another event bumps its count and timestamp
+    instead of inserting a new row. Other types are inserted as-is. All
+    notification fan-out should go through here.
+    """
+    preference = notification_preference(notification_type)
+    if preference is not None:
+        wanted = User.query.filter(User.id == user_id, User.wants_notification(preference))
+        if not db.session.query(wanted.exists()).scalar():
+            return None
+    
+    rule = current_app.config['NOTIFICATION_COALESCE_RULES'].get(notification_type)
+    
+    if rule is None:
+        return create_notification(user_id, title, message, notification_type, related_id)
+    
+    for attempt in range(2):
+        existing = Notification.query.filter_by(
+            user_id=user_id,
+            notification_type=notification_type,
+            related_id=related_id,
+            read_at=None
+        ).order_by(Notification.id.desc()).with_for_update().first()
+        
+        if existing:
+            existing.count = (existing.count or 1) + 1
+            existing.created_at = datetime.utcnow()
+            existing.title = title
+            existing.message = rule.get('message', message).format(count=existing.count)
+            # The client has to see (and ack) the updated version again
+            existing.delivered_at = None
+            queue_notification_push(existing)
+            return existing
+        
+        # Nothing to lock yet: the unique index on unread coalesced rows
+        # decides which of two concurrent senders inserts
+        pushes = db.session.info.setdefault('notification_pushes', [])
+        queued = len(pushes)
+        try:
+            with db.session.begin_nested():
+                notification = create_notification(user_id, title, message, notification_type, related_id)
+                db.session.flush()
+            return notification
+        except IntegrityError:
+            # Lost the race: drop the push and coalesce into the other sender's row
+            del pushes[queued:]
+            if attempt:
+                raise
+
+def read_notification(notification):
+    """Mark a single notification as read; the caller commits"""
+    if notification.read_at is not None:
+        return
+    
+    notification.read_at = datetime.utcnow()
+    adjust_notification_counter(notification.user_id, unread=-1)
+
+def mark_notifications_read(user_id, ids=None, before=None):
+    """
+    Mark a user's unread notifications as read in a single UPDATE
+    
+    Limited to `ids` and/or notifications created before `before` when given;
+    otherwise everything created up to now. Returns how many rows changed.
+    """
+    now = datetime.utcnow()
+    get_notification_counter(user_id)
+    
+    query = Notification.query.filter(
+        Notification.user_id == user_id,
+        Notification.read_at == None
+    )
+    if before is not None:
+        query = query.filter(Notification.created_at < before)
+    else:
+        # Don't touch notifications that arrive while this runs
+        query = query.filter(Notification.created_at <= now)
+    if ids is not None:
+        query = query.filter(Notification.id.in_(ids))
+    
+    count = query.update({Notification.read_at: now}, synchronize_session=False)
+    
+    if count:
+        adjust_notification_counter(user_id, unread=-count)
+    
+    return count
+
+def mark_all_notifications_read(user_id):
+    """Mark every unread notification as read and return how many changed"""
+    return mark_notifications_read(user_id)
+
+def delete_notifications(user_id, ids=None, before=None):
+    """
+    Delete a user's notifications in a single DELETE ... RETURNING
+    
+    Limited to `ids` and/or notifications created before `before`.
+    Returns how many rows were removed.
+    """
+    get_notification_counter(user_id)
+    
+    statement = delete(Notification).where(Notification.user_id == user_id)
+    if ids is not None:
+        statement = statement.where(Notification.id.in_(ids))
+    if before is not None:
+        statement = statement.where(Notification.created_at < before)
+    
+    # RETURNING read_at tells us how many of the deleted rows were unread
+    deleted = db.session.execute(
+        statement.returning(Notification.read_at),
+        execution_options={"synchronize_session": False}
+    ).all()
+    
+    unread = sum(1 for (read_at,) in deleted if read_at is None)
+    if deleted:
+        adjust_notification_counter(user_id, total=-len(deleted), unread=-unread)
+    
+    return len(deleted)
+
+def remove_notification(notification):
+    """Delete a single notification; the caller commits"""
+    user_id = notification.user_id
+    was_unread = notification.read_at is None
+    get_notification_counter(user_id)
+    
+    db.session.delete(notification)
+    adjust_notification_counter(user_id, total=-1, unread=-1 if was_unread else 0)
+
+def acknowledge_notifications(user_id, ids):
+    """Record that the client received the pushed notifications; the caller commits"""
+    return Notification.query.filter(
+        Notification.user_id == user_id,
+        Notification.id.in_(ids),
+        Notification.delivered_at == None
+    ).update({Notification.delivered_at: datetime.utcnow()}, synchronize_session=False)
+
+def get_undelivered_notifications(user_id, since=None, limit=None):
+    """Unacked notifications created (or coalesced) after `since`, oldest first"""
+    limit = limit or current_app.config['NOTIFICATION_REPLAY_LIMIT']
+    
+    query = Notification.query.filter(
+        Notification.user_id == user_id,
+        Notification.delivered_at == None
+    )
+    if since is not None:
+        query = query.filter(Notification.created_at > since)
+    
+    return query.order_by(Notification.created_at).limit(limit).all()
+
+# Real-time push: notifications written in a transaction are sent to the
+# user's socket room once that transaction commits, never before
+
+def queue_notification_push(notification):
+    db.session.info.setdefault('notification_pushes', []).append(notification)
+
+@event.listens_for(Session, 'before_commit')
+def serialize_notification_pushes(session):
+    # Savepoints commit too; only the outermost transaction counts
+    if session.in_nested_transaction():
+        return
+    
+    pending = session.info.pop('notification_pushes', None)
+    if not pending:
+        return
+    
+    # Flush so new rows have their id and timestamps
+    session.flush()
+    payloads = {}
+    for notification in pending:
+        if notification in session.deleted:
+            continue
+        payloads[notification.id] = (notification.user_id, notification.to_dict())
+    session.info['notification_payloads'] = list(payloads.values())
+
+@event.listens_for(Session, 'after_commit')
+def send_notification_pushes(session):
+    if session.in_nested_transaction():
+        return
+    
+    for user_id, data in session.info.pop('notification_payloads', []):
+        emit_to_rooms('notification', data, [f"user_{user_id}"])
+
+@event.listens_for(Session, 'after_transaction_end')
+def discard_notification_pushes(session, transaction):
+    # Rolled back (or committed and already sent): nothing may linger
+    if transaction.parent is None:
+        session.info.pop('notification_pushes', None)
+        session.info.pop('notification_payloads', None)
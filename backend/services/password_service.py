@@ -0,0 +1,68 @@
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+
+from app import bcrypt
+
+hash_pool = None
+
+def gevent_patched():
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+def get_hash_pool():
+    """
+    Bounded pool of real OS threads for bcrypt, created on first use
+    
+    bcrypt releases the GIL while hashing, so the work runs in parallel with
+    request handling. Under gevent the standard threads are greenlets, so
+    gevent's own thread pool is used there; waiting on it yields to the hub
+    instead of blocking every socket on the worker.
+    """
+    global hash_pool
+    if hash_pool is None:
+        workers = current_app.config['PASSWORD_HASH_WORKERS']
+        if gevent_patched():
+            from gevent.threadpool import ThreadPool
+            hash_pool = ThreadPool(workers)
+        else:
+            hash_pool = ThreadPoolExecutor(max_workers=workers)
+    return hash_pool
+
+def eventlet_patched():
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+def run_in_hash_pool(func, *args):
+    if eventlet_patched():
+        # eventlet ships its own native thread pool (size: EVENTLET_THREADPOOL_SIZE)
+        from eventlet import tpool
+        return tpool.execute(func, *args)
+    
+    pool = get_hash_pool()
+    if isinstance(pool, ThreadPoolExecutor):
+        return pool.submit(func, *args).result()
+    return pool.spawn(func, *args).get()
+
+def hash_password(password):
+    """bcrypt hash with the configured work factor (BCRYPT_LOG_ROUNDS)"""
+    rounds = current_app.config['BCRYPT_LOG_ROUNDS']
+    return run_in_hash_pool(bcrypt.generate_password_hash, password, rounds).decode('utf-8')
+
+def verify_password(password_hash, password):
+    if not password_hash or not password:
+        return False
+    return run_in_hash_pool(bcrypt.check_password_hash, password_hash, password)
+
+def password_needs_rehash(password_hash):
+    """True if the hash was made with a different work factor or bcrypt variant"""
+    try:
+        _, variant, rounds, _ = password_hash.split('$')
+        return variant != '2b' or int(rounds) != current_app.config['BCRYPT_LOG_ROUNDS']
+    except (AttributeError, ValueError):
+        return True
@@ -0,0 +1,53 @@
+import math
+from functools import wraps
+from flask import current_app, request
+
+from backend.services.kv_service import get_kv_store
+
+def identity_value(source):
+    """
+    The value a limit is keyed on: the client IP or a field of the JSON body
+    
+    Behind a reverse proxy the client IP comes from X-Forwarded-For, which
+    ProxyFix applies when PROXY_FIX_HOPS is set.
+    """
+    if source == 'ip':
+        return request.remote_addr
+    
+    value = (request.get_json(silent=True) or {}).get(source)
+    return str(value).strip() if value is not None else None
+
+def check_rate_limit(scope):
+    """
+    Count this request against the RATE_LIMITS entry for `scope`
+    
+    Each identity (e.g. 'ip', 'phone_number') has its own sliding window.
+    The request only counts against them when all of them let it through.
+    Returns the seconds to wait when any of them is over its limit, else None.
+    """
+    if not current_app.config['RATE_LIMIT_ENABLED']:
+        return None
+    
+    limits = []
+    for source, (limit, window) in current_app.config['RATE_LIMITS'][scope].items():
+        value = identity_value(source)
+        if value:
+            limits.append((f"ratelimit:{scope}:{source}:{value}", limit, window))
+    
+    allowed, retry_after = get_kv_store().hit(limits)
+    return None if allowed else retry_after
+
+def rate_limit(scope):
+    """Reject requests over the `scope` limits with a 429 before the view runs"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            retry_after = check_rate_limit(scope)
+            if retry_after is not None:
+                return {
+                    "status": "error",
+                    "message": "Too many attempts, please try again later"
+                }, 429, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,119 @@
+import io
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+from app import db, socketio
+from backend.services.storage_service import get_storage, storage_key, RESUMES
+
+# Skill terms picked out of resume text (lower case)
+SKILL_TERMS = [
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'ruby', 'php', 'swift',
+    'kotlin', 'sql', 'postgresql', 'mysql', 'mongodb', 'redis', 'html', 'css', 'react',
+    'angular', 'vue', 'node.js', 'django', 'flask', 'spring', 'aws', 'azure', 'gcp', 'docker',
+    'kubernetes', 'linux', 'git', 'machine learning', 'data analysis', 'excel', 'tableau',
+    'project management', 'agile', 'scrum', 'customer service', 'sales', 'marketing',
+    'accounting', 'bookkeeping', 'nursing', 'forklift', 'welding', 'driving', 'cooking',
+    'photoshop', 'figma', 'communication', 'leadership', 'english', 'malay', 'mandarin'
+]
+
+MAX_TEXT_LENGTH = 100000
+
+extraction_pool = None
+
+def get_extraction_pool():
+    """Process pool for resume parsing, created on first use in each API process"""
+    global extraction_pool
+    if extraction_pool is None:
+        extraction_pool = ProcessPoolExecutor(max_workers=current_app.config['RESUME_WORKERS'])
+    return extraction_pool
+
+def extract_resume_text(data, extension):
+    """Pull plain text out of a PDF or DOCX file; other formats give ''"""
+    if extension == 'pdf':
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            return ''
+        reader = PdfReader(io.BytesIO(data))
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+    
+    if extension == 'docx':
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            xml = archive.read('word/document.xml').decode('utf-8', errors='ignore')
+        # One line per paragraph, tags dropped
+        xml = re.sub(r'</w:p>', '\n', xml)
+        return re.sub(r'<[^>]+>', '', xml)
+    
+    return ''
+
+def extract_skill_terms(text, terms):
+    """Return the known skill terms that appear in `text` as whole words"""
+    lowered = text.lower()
+    found = set()
+    for term in terms:
+        if re.search(r'(?<![\w+#.])' + re.escape(term) + r'(?![\w+#])', lowered):
+            found.add(term)
+    return found
+
+def analyze_resume(data, extension, terms):
+    """Worker entry point: (text, skill terms) for one resume"""
+    try:
+        text = extract_resume_text(data, extension)
+    except Exception as e:
+        print(f"Error extracting resume text: {e}")
+        text = ''
+    
+    text = text[:MAX_TEXT_LENGTH]
+    return text, extract_skill_terms(text, terms)
+
+def index_resume(user_id, filename, text, terms):
+    """Upsert a user's CandidateSearch row and replace their skill terms; the caller commits"""
+    from backend.models.candidate import CandidateSearch, ResumeSkill
+    
+    candidate = CandidateSearch.query.get(user_id)
+    if candidate is None:
+        candidate = CandidateSearch(user_id=user_id, resume_url=filename)
+        db.session.add(candidate)
+    
+    candidate.resume_url = filename
+    candidate.resume_text = text
+    
+    # Only touch the terms that changed
+    existing = {skill.term for skill in candidate.skills}
+    for skill in list(candidate.skills):
+        if skill.term not in terms:
+            candidate.skills.remove(skill)
+    for term in terms - existing:
+        candidate.skills.append(ResumeSkill(term=term, user_id=user_id))
+    
+    return candidate
+
+def process_resume(app, user_id, filename):
+    """Extract and index a freshly uploaded resume"""
+    from backend.models.user import User
+    
+    with app.app_context():
+        with get_storage().open(storage_key(RESUMES, filename)) as resume:
+            data = resume.read()
+        
+        extension = filename.rsplit('.', 1)[-1].lower()
+        try:
+            text, terms = get_extraction_pool().submit(
+                analyze_resume, data, extension, SKILL_TERMS
+            ).result()
+        except Exception as e:
+            print(f"Error processing resume {filename}: {e}")
+            return
+        
+        user = User.query.get(user_id)
+        # Skip if a newer resume was uploaded in the meantime
+        if user and user.resume_url == filename:
+            index_resume(user_id, filename, text, terms)
+            db.session.commit()
+
+def schedule_resume_processing(user_id, filename):
+    """Queue extraction without blocking the request"""
+    app = current_app._get_current_object()
+    socketio.start_background_task(process_resume, app, user_id, filename)
@@ -0,0 +1,112 @@
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import delete, func
+
+from app import db
+from backend.models.notification import Notification
+from backend.services.notification_service import adjust_notification_counter, get_notification_counter
+
+def describe_policy(policy):
+    notification_type = policy.get('notification_type') or 'any'
+    state = {True: 'read', False: 'unread'}.get(policy.get('read'), 'all')
+    return f"{notification_type}/{state} older than {policy['days']} days"
+
+def policy_filter(policy, policies, now):
+    """Build the WHERE clause selecting the rows a retention policy removes"""
+    read = policy.get('read')
+    conditions = [Notification.created_at < now - timedelta(days=policy['days'])]
+    
+    if read is True:
+        conditions.append(Notification.read_at != None)
+    elif read is False:
+        conditions.append(Notification.read_at == None)
+    
+    if policy.get('notification_type'):
+        conditions.append(Notification.notification_type == policy['notification_type'])
+    else:
+        # Catch-all policies leave types with their own policy alone
+        specific_types = [
+            other['notification_type'] for other in policies
+            if other.get('notification_type') and other.get('read') in (read, None)
+        ]
+        if specific_types:
+            conditions.append(Notification.notification_type.notin_(specific_types))
+    
+    return db.and_(*conditions)
+
+def notification_retention_report(now=None):
+    """Dry run: how many notifications each retention policy would remove"""
+    now = now or datetime.utcnow()
+    policies = current_app.config['NOTIFICATION_RETENTION_POLICIES']
+    
+    report = []
+    for policy in policies:
+        count = db.session.query(func.count(Notification.id))\
+            .filter(policy_filter(policy, policies, now))\
+            .scalar()
+        report.append({"policy": describe_policy(policy), "count": count})
+    
+    return report
+
+def purge_notifications(batch_size=None, pause=None, now=None):
+    """
+    Delete notifications past their retention in small batches
+    
+    Each batch is its own short transaction (select ids, delete them, fix
+    the affected users' counters, commit) so no lock is held for long.
+    Returns the report of rows removed per policy.
+    """
+    now = now or datetime.utcnow()
+    batch_size = batch_size or current_app.config['NOTIFICATION_PURGE_BATCH_SIZE']
+    pause = current_app.config['NOTIFICATION_PURGE_PAUSE_SECONDS'] if pause is None else pause
+    policies = current_app.config['NOTIFICATION_RETENTION_POLICIES']
+    
+    report = []
+    for policy in policies:
+        condition = policy_filter(policy, policies, now)
+        removed = 0
+        
+        while True:
+            rows = db.session.query(Notification.id, Notification.user_id)\
+                .filter(condition)\
+                .order_by(Notification.id)\
+                .limit(batch_size)\
+                .all()
+            if not rows:
+                break
+            ids = [row.id for row in rows]
+            
+            # Backfill missing counters while the rows are still there, so
+            # the deltas below aren't applied to an already reduced count
+            for user_id in {row.user_id for row in rows}:
+                get_notification_counter(user_id)
+            
+            deleted = db.session.execute(
+                delete(Notification)
+                .where(Notification.id.in_(ids))
+                .returning(Notification.user_id, Notification.read_at),
+                execution_options={"synchronize_session": False}
+            ).all()
+            
+            changes = defaultdict(lambda: [0, 0])
+            for user_id, read_at in deleted:
+                changes[user_id][0] -= 1
+                if read_at is None:
+                    changes[user_id][1] -= 1
+            
+            for user_id, (total, unread) in changes.items():
+                adjust_notification_counter(user_id, total=total, unread=unread)
+            
+            db.session.commit()
+            removed += len(deleted)
+            
+            if len(ids) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        
+        report.append({"policy": describe_policy(policy), "count": removed})
+    
+    return report
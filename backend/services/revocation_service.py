@@ -0,0 +1,197 @@
+import hashlib
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+from backend.models.revoked_token import RevokedToken
+
+class BloomFilter:
+    """Fixed-size Bloom filter: no false negatives, rare false positives"""
+    
+    def __init__(self, size_bits, hash_count):
+        self.size = size_bits
+        self.hash_count = hash_count
+        self.bits = bytearray((size_bits + 7) // 8)
+    
+    def positions(self, item):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+    
+    def add(self, item):
+        for position in self.positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+    
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(item))
+
+def jti_member(jti):
+    return f"jti:{jti}"
+
+def user_member(user_id):
+    return f"user:{user_id}"
+
+class RevocationFilter:
+    """
+    Per-process Bloom filter over the RevokedToken table
+    
+    Rows added by any worker are pulled in every `sync_interval` seconds with
+    one indexed query, and the filter is rebuilt every `rebuild_interval`
+    seconds so expired entries drop out of it.
+    """
+    
+    # Re-read a little of the previous window too: a row committed late can
+    # carry a created_at from before the last sync
+    SYNC_OVERLAP = timedelta(seconds=30)
+    
+    def __init__(self, size_bits, hash_count, sync_interval, rebuild_interval):
+        self.size_bits = size_bits
+        self.hash_count = hash_count
+        self.sync_interval = sync_interval
+        self.rebuild_interval = rebuild_interval
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.synced_since = None
+        self.synced_at = 0
+        self.built_at = 0
+    
+    def sync(self):
+        now = time.monotonic()
+        if self.bloom is not None and now - self.synced_at < self.sync_interval:
+            return
+        
+        with self.lock:
+            started = datetime.utcnow()
+            if self.bloom is None or now - self.built_at >= self.rebuild_interval:
+                bloom = BloomFilter(self.size_bits, self.hash_count)
+                query = RevokedToken.query.filter(RevokedToken.expires_at > started)
+                self.built_at = now
+            else:
+                bloom = self.bloom
+                query = RevokedToken.query.filter(RevokedToken.created_at >= self.synced_since - self.SYNC_OVERLAP)
+            
+            for jti, user_id in query.with_entities(RevokedToken.jti, RevokedToken.user_id):
+                bloom.add(jti_member(jti) if jti else user_member(user_id))
+            
+            self.bloom = bloom
+            self.synced_since = started
+            self.synced_at = now
+    
+    def might_contain(self, member):
+        self.sync()
+        return member in self.bloom
+    
+    def add(self, member):
+        self.sync()
+        self.bloom.add(member)
+
+revocation_filter = None
+
+def get_revocation_filter():
+    global revocation_filter
+    if revocation_filter is None:
+        config = current_app.config
+        revocation_filter = RevocationFilter(
+            config['TOKEN_REVOCATION_BLOOM_BITS'],
+            config['TOKEN_REVOCATION_BLOOM_HASHES'],
+            config['TOKEN_REVOCATION_SYNC_SECONDS'],
+            config['TOKEN_REVOCATION_REBUILD_SECONDS']
+        )
+    return revocation_filter
+
+def utc_from_timestamp(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+def token_issued_at(jwt_payload):
+    """
+    When a token was issued, to the microsecond (the `issued_at` claim)
+    
+    Tokens that predate the claim only have the whole-second `iat`, which
+    makes them look slightly older, so a cutoff errs on revoking them.
+    """
+    return utc_from_timestamp(jwt_payload.get('issued_at', jwt_payload['iat']))
+
+def queue_filter_add(member):
+    """Add to this process's filter once the revocation is committed"""
+    db.session.info.setdefault('revoked_members', []).append(member)
+
+def revoke_token(jwt_payload):
+    """Revoke a single access token (logout); the caller commits"""
+    db.session.add(RevokedToken(
+        jti=jwt_payload['jti'],
+        user_id=int(jwt_payload['sub']),
+        expires_at=utc_from_timestamp(jwt_payload['exp'])
+    ))
+    queue_filter_add(jti_member(jwt_payload['jti']))
+
+def revoke_user_tokens(user_id):
+    """
+    Revoke every token issued to a user up to now; the caller commits
+    
+    The cutoff has microsecond precision, so a token handed out right after
+    (e.g. by change_password) is not caught by its own cutoff.
+    """
+    now = datetime.utcnow()
+    db.session.add(RevokedToken(
+        user_id=user_id,
+        issued_before=now,
+        expires_at=now + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+    ))
+    queue_filter_add(user_member(user_id))
+
+def is_token_revoked(jwt_payload):
+    """
+    Blocklist check for every protected request
+    
+    The Bloom filter answers "not revoked" for almost every token without
+    touching the database; only possible hits are confirmed against the table.
+    """
+    revocations = get_revocation_filter()
+    now = datetime.utcnow()
+    
+    jti = jwt_payload['jti']
+    if revocations.might_contain(jti_member(jti)):
+        if RevokedToken.query.filter(RevokedToken.jti == jti, RevokedToken.expires_at > now).first():
+            return True
+    
+    user_id = int(jwt_payload['sub'])
+    if revocations.might_contain(user_member(user_id)):
+        cutoff = RevokedToken.query.filter(
+            RevokedToken.user_id == user_id,
+            RevokedToken.jti == None,
+            RevokedToken.issued_before >= token_issued_at(jwt_payload),
+            RevokedToken.expires_at > now
+        ).first()
+        if cutoff:
+            return True
+    
+    return False
+
+@event.listens_for(Session, 'after_commit')
+def add_committed_revocations(session):
+    if session.in_nested_transaction():
+        return
+    
+    members = session.info.pop('revoked_members', ())
+    if members:
+        revocations = get_revocation_filter()
+        for member in members:
+            revocations.add(member)
+
+@event.listens_for(Session, 'after_transaction_end')
+def discard_revocations(session, transaction):
+    # Savepoint rollbacks keep the outer transaction's queue
+    if transaction.parent is None:
+        session.info.pop('revoked_members', None)
+
+def purge_revoked_tokens():
+    """Delete revocations whose tokens have expired anyway"""
+    count = RevokedToken.query.filter(RevokedToken.expires_at <= datetime.utcnow())\
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return count
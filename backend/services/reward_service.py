@@ -0,0 +1,170 @@
+import json
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from backend.models.reward import Reward, UserPoints, RewardBucket
+from backend.models.user import User
+from backend.services.kv_service import get_kv_store
+
+# Leaderboard windows besides all-time
+LEADERBOARD_WINDOWS = ('7d', '30d', 'month')
+
+def get_user_points(user_id):
+    """
+    Return the user's UserPoints row, creating it on first use
+    
+    Users that predate the table are backfilled with one aggregate over
+    their existing rewards.
+    """
+    user_points = UserPoints.query.get(user_id)
+    if user_points:
+        return user_points
+    
+    # Count only what is already stored, not what is pending in this session
+    with db.session.no_autoflush:
+        points, entries = db.session.query(
+            func.coalesce(func.sum(Reward.points), 0),
+            func.count(Reward.id)
+        ).filter(Reward.user_id == user_id).one()
+    
+    user_points = UserPoints(user_id=user_id, points=points, entries=entries)
+    try:
+        with db.session.begin_nested():
+            db.session.add(user_points)
+    except IntegrityError:
+        # Another request created it first
+        user_points = UserPoints.query.get(user_id)
+    
+    return user_points
+
+def add_to_bucket(user_id, day, points):
+    """Add points to the user's bucket for `day`, creating it if needed"""
+    if RewardBucket.query.get((day, user_id)) is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(RewardBucket(day=day, user_id=user_id, points=0))
+        except IntegrityError:
+            # Another request created it first
+            pass
+    
+    RewardBucket.query.filter_by(day=day, user_id=user_id).update({
+        RewardBucket.points: RewardBucket.points + points
+    }, synchronize_session='fetch')
+
+def award_points(user_id, points, action, description=None):
+    """
+    Record a reward and add it to the user's running total and today's
+    bucket; the caller commits
+    """
+    get_user_points(user_id)
+    now = datetime.utcnow()
+    
+    reward = Reward(
+        user_id=user_id,
+        action=action,
+        points=points,
+        description=description,
+        created_at=now
+    )
+    db.session.add(reward)
+    add_to_bucket(user_id, now.date(), points)
+    
+    UserPoints.query.filter_by(user_id=user_id).update({
+        UserPoints.points: UserPoints.points + points,
+        UserPoints.entries: UserPoints.entries + 1,
+        UserPoints.updated_at: datetime.utcnow()
+    }, synchronize_session='fetch')
+    
+    return reward
+
+def with_ranks(rows):
+    """Competition ranks (1, 2, 2, 4) for rows already sorted by points"""
+    result = []
+    for position, (user_id, name, points) in enumerate(rows, start=1):
+        rank = result[-1]['rank'] if result and result[-1]['total_points'] == points else position
+        result.append({
+            "rank": rank,
+            "user_id": user_id,
+            "name": name or f"User {user_id}",
+            "total_points": points
+        })
+    return result
+
+def get_points_leaderboard(limit=10):
+    """Top users by all-time points: an index scan of `limit` rows, names included"""
+    rows = db.session.query(UserPoints.user_id, User.name, UserPoints.points)\
+        .join(User, User.id == UserPoints.user_id)\
+        .filter(UserPoints.points > 0)\
+        .order_by(UserPoints.points.desc(), UserPoints.user_id)\
+        .limit(limit)\
+        .all()
+    
+    return with_ranks(rows)
+
+def get_user_rank(user_id):
+    """A user's all-time points and rank (1 + users with strictly more points)"""
+    points = get_user_points(user_id).points
+    ahead = db.session.query(func.count(UserPoints.user_id))\
+        .filter(UserPoints.points > points)\
+        .scalar()
+    
+    return {"total_points": points, "rank": ahead + 1 if points > 0 else None}
+
+def window_start(window, today=None):
+    """First day included in a leaderboard window"""
+    today = today or datetime.utcnow().date()
+    if window == '7d':
+        return today - timedelta(days=6)
+    if window == '30d':
+        return today - timedelta(days=29)
+    if window == 'month':
+        return today.replace(day=1)
+    raise ValueError(f"Unknown leaderboard window: {window}")
+
+def get_window_leaderboard(window, limit=10):
+    """
+    Top users by points earned in a window (last 7/30 days, this month)
+    
+    Sums only the daily buckets inside the window. The result is cached in
+    the shared store for LEADERBOARD_CACHE_SECONDS.
+    """
+    start = window_start(window)
+    store = get_kv_store()
+    cache_key = f"leaderboard:{window}:{start.isoformat()}:{limit}"
+    
+    cached = store.get(cache_key)
+    if cached is not None:
+        return json.loads(cached)
+    
+    total = func.sum(RewardBucket.points)
+    rows = db.session.query(RewardBucket.user_id, User.name, total)\
+        .join(User, User.id == RewardBucket.user_id)\
+        .filter(RewardBucket.day >= start)\
+        .group_by(RewardBucket.user_id, User.name)\
+        .having(total > 0)\
+        .order_by(total.desc(), RewardBucket.user_id)\
+        .limit(limit)\
+        .all()
+    
+    leaderboard = with_ranks(rows)
+    store.set(cache_key, json.dumps(leaderboard), current_app.config['LEADERBOARD_CACHE_SECONDS'])
+    return leaderboard
+
+def get_user_window_rank(user_id, window):
+    """A user's points and rank within a window"""
+    start = window_start(window)
+    points = db.session.query(func.coalesce(func.sum(RewardBucket.points), 0))\
+        .filter(RewardBucket.user_id == user_id, RewardBucket.day >= start)\
+        .scalar()
+    
+    ahead = db.session.query(RewardBucket.user_id)\
+        .filter(RewardBucket.day >= start)\
+        .group_by(RewardBucket.user_id)\
+        .having(func.sum(RewardBucket.points) > points)\
+        .subquery()
+    ahead = db.session.query(func.count()).select_from(ahead).scalar()
+    
+    return {"total_points": points, "rank": ahead + 1 if points > 0 else None}
@@ -0,0 +1,80 @@
+import re
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from backend.models.skill import Skill, SkillAlias
+
+# Built-in spellings; operators can add more as SkillAlias rows
+SKILL_ALIASES = {
+    'js': 'javascript',
+    'ts': 'typescript',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'bahasa malaysia': 'malay',
+}
+
+def normalize_skill_name(raw):
+    """Case-fold and collapse whitespace; '' for blank input"""
+    return re.sub(r'\s+', ' ', (raw or '').strip()).casefold()
+
+def canonical_skill_name(raw):
+    """Resolve a user-entered skill to its canonical name via the alias tables"""
+    name = normalize_skill_name(raw)
+    if not name:
+        return name
+    
+    alias = SkillAlias.query.get(name)
+    if alias:
+        return alias.skill.name
+    
+    return SKILL_ALIASES.get(name, name)
+
+def split_skills(value):
+    """Skills arrive as a comma-separated string (as stored on User) or a list"""
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item for item in (value or []) if isinstance(item, str) and item.strip()]
+
+def get_or_create_skill(raw):
+    """Return the Skill for a user-entered name, creating it if new"""
+    name = canonical_skill_name(raw)
+    if not name:
+        return None
+    
+    skill = Skill.query.filter_by(name=name).first()
+    if skill is None:
+        skill = Skill(name=name, display_name=raw.strip())
+        try:
+            with db.session.begin_nested():
+                db.session.add(skill)
+        except IntegrityError:
+            # Created concurrently by another request
+            skill = Skill.query.filter_by(name=name).first()
+    
+    return skill
+
+def set_user_skills(user, value):
+    """Replace the user's normalized skills; the caller commits"""
+    skills = {}
+    for raw in split_skills(value):
+        skill = get_or_create_skill(raw)
+        if skill is not None:
+            skills[skill.name] = skill
+    
+    user.skill_set = list(skills.values())
+    return user.skill_set
+
+def resolve_skill_ids(names):
+    """Ids of the known skills among `names` (after canonicalization), and whether all were found"""
+    canonical = {canonical_skill_name(name) for name in names} - {''}
+    ids = [row[0] for row in db.session.query(Skill.id).filter(Skill.name.in_(canonical)).all()]
+    return ids, len(ids) == len(canonical)
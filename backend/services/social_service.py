@@ -1,30 +1,158 @@
+import re
+import threading
+import time
+import jwt
 import requests
-import json
+from requests.adapters import HTTPAdapter
 from flask import current_app
 
+GOOGLE_ISSUERS = ['accounts.google.com', 'https://accounts.google.com']
+
+http_session = None
+
+def get_http_session():
+    """Keep-alive session shared by all outbound provider calls in this process"""
+    global http_session
+    if http_session is None:
+        http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=current_app.config['SOCIAL_HTTP_POOL_SIZE'])
+        http_session.mount('https://', adapter)
+        http_session.mount('http://', adapter)
+    return http_session
+
+def cache_max_age(response, default):
+    match = re.search(r'max-age=(\d+)', response.headers.get('Cache-Control', ''))
+    return int(match.group(1)) if match else default
+
+def parse_jwks(jwks):
+    """{kid: public key} for a JWKS document; keys without a kid or unusable keys are skipped"""
+    keys = {}
+    for key in jwks['keys']:
+        try:
+            keys[key['kid']] = jwt.PyJWK(key).key
+        except (KeyError, TypeError, jwt.PyJWTError):
+            continue
+    return keys
+
+class JWKSCache:
+    """
+    Signing keys from a JWKS endpoint, kept for as long as its Cache-Control allows
+    
+    An unknown key id triggers an early refresh (keys rotate before the old
+    max-age runs out), at most once per `min_refresh_interval` seconds.
+    Only one caller fetches at a time, outside the lock, while the others
+    carry on with the keys they have; after a failed or malformed fetch
+    the old keys are kept and nothing is fetched for `failure_backoff`
+    seconds.
+    """
+    
+    def __init__(self, url, timeout, default_max_age=3600, min_refresh_interval=60, failure_backoff=30):
+        self.url = url
+        self.timeout = timeout
+        self.default_max_age = default_max_age
+        self.min_refresh_interval = min_refresh_interval
+        self.failure_backoff = failure_backoff
+        self.keys = {}
+        self.expires_at = 0
+        self.fetched_at = None
+        self.retry_at = 0
+        self.refreshing = False
+        self.lock = threading.Lock()
+    
+    def fetch(self):
+        """Download and parse the key set; returns (keys, max_age)"""
+        response = get_http_session().get(self.url, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_jwks(response.json()), cache_max_age(response, self.default_max_age)
+    
+    def get_key(self, kid):
+        with self.lock:
+            now = time.monotonic()
+            stale = now >= self.expires_at
+            rotated = kid not in self.keys and (
+                self.fetched_at is None or now - self.fetched_at >= self.min_refresh_interval
+            )
+            if not (stale or rotated) or self.refreshing or now < self.retry_at:
+                return self.keys.get(kid)
+            self.refreshing = True
+        
+        keys = None
+        try:
+            keys, max_age = self.fetch()
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"Error refreshing JWKS from {self.url}: {e}")
+        finally:
+            with self.lock:
+                self.refreshing = False
+                now = time.monotonic()
+                if keys is None:
+                    self.retry_at = now + self.failure_backoff
+                else:
+                    self.keys = keys
+                    self.fetched_at = now
+                    self.expires_at = now + max_age
+        
+        return self.keys.get(kid)
+
+class StaticKeys:
+    """Fixed JWKS (GOOGLE_JWKS), e.g. a local test key instead of Google's"""
+    
+    def __init__(self, jwks):
+        self.keys = parse_jwks(jwks)
+    
+    def get_key(self, kid):
+        return self.keys.get(kid)
+
+def get_google_keys(app=None):
+    app = app or current_app
+    keys = app.extensions.get('google_jwks')
+    
+    if keys is None:
+        if app.config['GOOGLE_JWKS']:
+            keys = StaticKeys(app.config['GOOGLE_JWKS'])
+        else:
+            keys = JWKSCache(app.config['GOOGLE_JWKS_URL'], timeout=app.config['SOCIAL_HTTP_TIMEOUT'])
+        app.extensions['google_jwks'] = keys
+    
+    return keys
+
 def verify_google_token(token):
     """
-    Verify a Google OAuth token and return user info if valid
+    Verify a Google ID token and return user info if valid
     
-    In a real implementation, this would use the Google API client library
-    or make proper calls to Google's token info endpoint
+    The signature, audience, issuer and expiry are checked locally against
+    Google's published keys, so a login needs no round trip to Google.
     """
+    client_id = current_app.config['GOOGLE_CLIENT_ID']
+    if not client_id:
+        print("Error verifying Google token: GOOGLE_CLIENT_ID is not configured")
+        return None
+    
     try:
-        # This is a simplified implementation
-        # In production: Use google-auth library
-        response = requests.get(f'https://oauth2.googleapis.com/tokeninfo?id_token={token}')
+        key = get_google_keys().get_key(jwt.get_unverified_header(token).get('kid'))
+        if key is None:
+            return None
         
-        if response.status_code == 200:
-            user_info = response.json()
-            return {
-                'sub': user_info.get('sub'),  # Google's user ID
-                'email': user_info.get('email'),
-                'name': user_info.get('name')
-            }
-        return None
-    except Exception as e:
+        claims = jwt.decode(
+            token, key,
+            algorithms=['RS256'],
+            audience=client_id,
+            issuer=GOOGLE_ISSUERS,
+            leeway=30
+        )
+    except jwt.PyJWTError as e:
         print(f"Error verifying Google token: {e}")
         return None
+    
+    # Accounts are matched by email, so it must be one Google has verified
+    if not claims.get('email') or not claims.get('email_verified'):
+        return None
+    
+    return {
+        'sub': claims.get('sub'),  # Google's user ID
+        'email': claims.get('email'),
+        'name': claims.get('name')
+    }
 
 def verify_linkedin_token(token):
     """
@@ -40,7 +168,11 @@ def verify_linkedin_token(token):
             'Content-Type': 'application/json'
         }
         
-        response = requests.get('https://api.linkedin.com/v2/me', headers=headers)
+        response = get_http_session().get(
+            'https://api.linkedin.com/v2/me',
+            headers=headers,
+            timeout=current_app.config['SOCIAL_HTTP_TIMEOUT']
+        )
         
         if response.status_code == 200:
             user_info = response.json()
@@ -52,4 +184,4 @@ def verify_linkedin_token(token):
         return None
     except Exception as e:
         print(f"Error verifying LinkedIn token: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,384 @@
+import hashlib
+import mimetypes
+import os
+import shutil
+from datetime import datetime, timedelta
+from flask import current_app, redirect, request, send_file, make_response
+from sqlalchemy import event, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+# Folders (local) / key prefixes (S3) for each kind of upload
+RESUMES = 'resumes'
+CREDENTIALS = 'credentials'
+PROFILE_IMAGES = 'profile_images'
+
+CHUNK_SIZE = 1024 * 1024
+
+class LocalStorage:
+    """Stores uploads under a directory on this node's disk"""
+    
+    def __init__(self, root):
+        self.root = root
+    
+    def path(self, key):
+        return os.path.join(self.root, key)
+    
+    def save(self, fileobj, key, content_type=None):
+        """Stream `fileobj` to disk in chunks"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        with open(path, 'wb') as out:
+            shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+        
+        return key
+    
+    def open(self, key):
+        return open(self.path(key), 'rb')
+    
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+    
+    def delete(self, key):
+        if self.exists(key):
+            os.remove(self.path(key))
+    
+    def url(self, key, filename=None):
+        # Local files have no public URL; they are served by the app
+        return None
+
+class S3Storage:
+    """Stores uploads in an S3-compatible bucket (AWS S3, MinIO, ...)"""
+    
+    def __init__(self, bucket, endpoint_url=None, region=None, chunk_size=8 * 1024 * 1024,
+                 url_expires=3600):
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        
+        self.bucket = bucket
+        self.url_expires = url_expires
+        self.client = boto3.client('s3', endpoint_url=endpoint_url, region_name=region)
+        # Anything above one chunk goes up as a multipart upload, one part at a time
+        self.transfer_config = TransferConfig(
+            multipart_threshold=chunk_size,
+            multipart_chunksize=chunk_size,
+            max_concurrency=1,
+            use_threads=False
+        )
+    
+    def save(self, fileobj, key, content_type=None):
+        """Stream `fileobj` to the bucket (multipart above the chunk size)"""
+        extra_args = {'ContentType': content_type} if content_type else None
+        self.client.upload_fileobj(
+            fileobj, self.bucket, key,
+            ExtraArgs=extra_args,
+            Config=self.transfer_config
+        )
+        return key
+    
+    def open(self, key):
+        return self.client.get_object(Bucket=self.bucket, Key=key)['Body']
+    
+    def exists(self, key):
+        from botocore.exceptions import ClientError
+        
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except ClientError:
+            return False
+    
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+    
+    def url(self, key, filename=None):
+        """Presigned GET URL so clients download straight from the bucket"""
+        params = {'Bucket': self.bucket, 'Key': key}
+        if filename:
+            params['ResponseContentDisposition'] = f'attachment; filename="{filename}"'
+        
+        return self.client.generate_presigned_url(
+            'get_object', Params=params, ExpiresIn=self.url_expires
+        )
+
+def get_storage(app=None):
+    """Return the app's configured storage backend (created once per app)"""
+    app = app or current_app
+    storage = app.extensions.get('storage')
+    
+    if storage is None:
+        if app.config['STORAGE_BACKEND'] == 's3':
+            storage = S3Storage(
+                bucket=app.config['S3_BUCKET'],
+                endpoint_url=app.config['S3_ENDPOINT_URL'],
+                region=app.config['S3_REGION'],
+                chunk_size=app.config['S3_MULTIPART_CHUNK_SIZE'],
+                url_expires=app.config['S3_PRESIGNED_URL_EXPIRES']
+            )
+        else:
+            storage = LocalStorage(app.config['UPLOAD_FOLDER'])
+        app.extensions['storage'] = storage
+    
+    return storage
+
+def storage_key(folder, filename):
+    return f"{folder}/{filename}"
+
+def hash_stream(fileobj):
+    """Streaming SHA-256 of a seekable file; leaves it rewound"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+        size += len(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+def save_upload(fileobj, folder, extension, content_type=None):
+    """
+    Store an upload content-addressed and return its filename (<sha256>.<ext>)
+    
+    The content is hashed first; if an identical blob already exists in
+    `folder` nothing is written and only its reference count goes up.
+    The caller commits together with the row that references the file. New
+    bytes are written as soon as this transaction has claimed their
+    StoredFile row, so a committed reference never points at a missing
+    blob; if the transaction rolls back instead, the blob is recorded as
+    unreferenced and the garbage collector reclaims it.
+    """
+    from app import db
+    from backend.models.stored_file import StoredFile
+    
+    sha256, size = hash_stream(fileobj)
+    filename = f"{sha256}.{extension.lower()}"
+    key = storage_key(folder, filename)
+    
+    blob = StoredFile.query.get(key)
+    if blob is None:
+        blob = StoredFile(key=key, sha256=sha256, size=size, content_type=content_type, ref_count=0)
+        try:
+            with db.session.begin_nested():
+                db.session.add(blob)
+        except IntegrityError:
+            # Same content uploaded concurrently; that upload writes the bytes
+            pass
+        else:
+            get_storage().save(fileobj, key, content_type=content_type)
+            db.session.info.setdefault('written_uploads', []).append(
+                {"key": key, "sha256": sha256, "size": size, "content_type": content_type}
+            )
+    
+    StoredFile.query.filter_by(key=key).update({
+        StoredFile.ref_count: StoredFile.ref_count + 1,
+        StoredFile.released_at: None
+    }, synchronize_session=False)
+    
+    return filename
+
+@event.listens_for(Session, 'after_commit')
+def forget_committed_uploads(session):
+    if session.in_nested_transaction():
+        return
+    
+    session.info.pop('written_uploads', None)
+
+@event.listens_for(Session, 'after_transaction_end')
+def record_rolled_back_uploads(session, transaction):
+    """
+    Blobs written by a transaction that then rolled back lost their row;
+    record them unreferenced (outside the session) so the garbage collector
+    finds them. If another upload has claimed the key since, its row
+    already covers the blob.
+    """
+    if transaction.parent is not None:
+        return
+    
+    uploads = session.info.pop('written_uploads', None)
+    if not uploads:
+        return
+    
+    from app import db
+    from backend.models.stored_file import StoredFile
+    
+    for values in uploads:
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(insert(StoredFile).values(
+                    **values, ref_count=0, created_at=datetime.utcnow(), released_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            pass
+
+def release_upload(folder, filename):
+    """Drop one reference to a stored upload; the garbage collector removes it at zero"""
+    from backend.models.stored_file import StoredFile
+    
+    if not filename:
+        return
+    
+    StoredFile.query.filter(StoredFile.key == storage_key(folder, filename), StoredFile.ref_count > 0)\
+        .update({
+            StoredFile.ref_count: StoredFile.ref_count - 1,
+            StoredFile.released_at: datetime.utcnow()
+        }, synchronize_session=False)
+
+def release_user_uploads(user):
+    """
+    Drop every upload reference a user holds, before the user is deleted
+    
+    Profile image renditions go with the original when it is collected.
+    """
+    release_upload(RESUMES, user.resume_url)
+    release_upload(PROFILE_IMAGES, user.profile_image)
+    for credential in user.credentials:
+        release_upload(CREDENTIALS, credential.file_url)
+
+def is_upload_referenced(folder, filename):
+    """Check the rows that can point at an upload"""
+    from app import db
+    from backend.models.user import User
+    from backend.models.credential import Credential
+    
+    if folder == RESUMES:
+        query = User.query.filter_by(resume_url=filename)
+    elif folder == PROFILE_IMAGES:
+        query = User.query.filter_by(profile_image=filename)
+    else:
+        query = Credential.query.filter_by(file_url=filename)
+    
+    return db.session.query(query.exists()).scalar()
+
+def count_upload_references():
+    """Reference counts per storage key, computed from User and Credential rows"""
+    from app import db
+    from sqlalchemy import func
+    from backend.models.user import User
+    from backend.models.credential import Credential
+    
+    counts = {}
+    for folder, column in ((RESUMES, User.resume_url), (PROFILE_IMAGES, User.profile_image),
+                           (CREDENTIALS, Credential.file_url)):
+        rows = db.session.query(column, func.count()).filter(column != None).group_by(column).all()
+        for filename, count in rows:
+            counts[storage_key(folder, filename)] = count
+    return counts
+
+def collect_upload_garbage(dry_run=False, recount=False, batch_size=500):
+    """
+    Delete blobs no User or Credential row references any more
+    
+    Only blobs unreferenced for longer than UPLOAD_GC_GRACE_HOURS are
+    considered, and each one is re-checked against the referencing tables
+    before it is removed. `recount` first rebuilds every reference count
+    from those tables. Returns the number of blobs (that would be) removed.
+    """
+    from app import db
+    from backend.models.stored_file import StoredFile
+    
+    storage = get_storage()
+    
+    if recount:
+        counts = count_upload_references()
+        for blob in StoredFile.query.yield_per(batch_size):
+            actual = counts.get(blob.key, 0)
+            if blob.ref_count != actual:
+                blob.ref_count = actual
+                blob.released_at = datetime.utcnow() if actual == 0 else None
+        if not dry_run:
+            db.session.commit()
+    
+    from backend.services.image_service import IMAGE_FORMATS
+    
+    cutoff = datetime.utcnow() - timedelta(hours=current_app.config['UPLOAD_GC_GRACE_HOURS'])
+    removed = 0
+    last_key = ''
+    while True:
+        candidates = StoredFile.query.filter(
+            StoredFile.key > last_key,
+            StoredFile.ref_count <= 0,
+            db.or_(StoredFile.released_at == None, StoredFile.released_at < cutoff),
+            StoredFile.created_at < cutoff
+        ).order_by(StoredFile.key).limit(batch_size).all()
+        
+        if not candidates:
+            break
+        last_key = candidates[-1].key
+        
+        for blob in candidates:
+            folder, filename = blob.key.split('/', 1)
+            if is_upload_referenced(folder, filename):
+                # Count had drifted; repair it instead of deleting
+                if not dry_run:
+                    blob.ref_count = 1
+                continue
+            
+            removed += 1
+            if dry_run:
+                continue
+            
+            storage.delete(blob.key)
+            if folder == PROFILE_IMAGES:
+                # Renditions are named after the original
+                base = os.path.splitext(filename)[0]
+                for size in current_app.config['PROFILE_IMAGE_SIZES']:
+                    for extension, _ in IMAGE_FORMATS.values():
+                        storage.delete(storage_key(folder, f"{base}_{size}.{extension}"))
+            db.session.delete(blob)
+        
+        if not dry_run:
+            db.session.commit()
+    
+    return removed
+
+def send_stored_file(folder, filename, as_attachment=True, max_age=None):
+    """
+    Respond with a stored upload, or None if it doesn't exist
+    
+    Object storage redirects to a presigned URL. Local files get an ETag
+    (size + mtime) and are answered with 304 on If-None-Match. Depending on
+    FILE_SERVING_MODE the bytes are then sent by the app (with Range
+    support), or handed to the reverse proxy via X-Accel-Redirect (nginx)
+    or X-Sendfile (Apache/lighttpd) so no worker is tied up streaming.
+    """
+    storage = get_storage()
+    key = storage_key(folder, filename)
+    
+    url = storage.url(key, filename=filename if as_attachment else None)
+    if url:
+        return redirect(url)
+    
+    path = storage.path(key)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    
+    etag = f"{stat.st_size:x}-{int(stat.st_mtime * 1000):x}"
+    mode = current_app.config['FILE_SERVING_MODE']
+    
+    if mode == 'app':
+        # Werkzeug answers If-None-Match/If-Modified-Since and Range requests
+        return send_file(path, as_attachment=as_attachment, download_name=filename,
+                         etag=etag, conditional=True, max_age=max_age)
+    
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = make_response('')
+        if mode == 'x-accel':
+            response.headers['X-Accel-Redirect'] = f"{current_app.config['X_ACCEL_REDIRECT_PREFIX']}/{key}"
+        else:
+            response.headers['X-Sendfile'] = os.path.abspath(path)
+        
+        # The proxy fills in the body, length and Range handling
+        response.headers['Content-Type'] = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response.headers['Accept-Ranges'] = 'bytes'
+        if as_attachment:
+            response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    
+    response.set_etag(etag)
+    if max_age is not None:
+        response.cache_control.max_age = max_age
+    
+    return response
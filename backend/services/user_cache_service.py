@@ -0,0 +1,118 @@
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app import db
+from backend.models.user import User
+from backend.services.kv_service import get_kv_store
+
+class UserCache:
+    """Process-local LRU of User column snapshots, each tagged with the user's version"""
+    
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()  # user_id -> (values, version, cached_at)
+        self.lock = threading.Lock()
+    
+    def get(self, user_id, version, max_age):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None:
+                return None
+            
+            values, entry_version, cached_at = entry
+            if entry_version != version or time.monotonic() - cached_at > max_age:
+                del self.entries[user_id]
+                return None
+            
+            self.entries.move_to_end(user_id)
+            return values
+    
+    def put(self, user_id, values, version):
+        with self.lock:
+            self.entries[user_id] = (values, version, time.monotonic())
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+    
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+user_cache = None
+
+def get_user_cache():
+    global user_cache
+    if user_cache is None:
+        user_cache = UserCache(current_app.config['USER_CACHE_SIZE'])
+    return user_cache
+
+def user_version_key(user_id):
+    return f"user_version:{user_id}"
+
+def snapshot(user):
+    return {attr.key: copy.deepcopy(getattr(user, attr.key)) for attr in User.__mapper__.column_attrs}
+
+def load_user(user_id):
+    """
+    Load a user for this request, from the cross-request cache when possible
+    
+    Cached entries are only used while their version matches the one in the
+    shared store, which every committed change to the user replaces. A hit
+    is attached to the session without a query, so handlers can modify and
+    commit it as usual. Without REDIS_URL there is no store shared between
+    workers to carry those versions, so every request queries the database.
+    """
+    user_id = int(user_id)
+    if not current_app.config['REDIS_URL']:
+        return User.query.get(user_id)
+    
+    version = get_kv_store().get(user_version_key(user_id))
+    cache = get_user_cache()
+    
+    values = cache.get(user_id, version, current_app.config['USER_CACHE_TTL_SECONDS'])
+    if values is not None:
+        user = User(**copy.deepcopy(values))
+        make_transient_to_detached(user)
+        return db.session.merge(user, load=False)
+    
+    user = User.query.get(user_id)
+    if user is not None:
+        # Tagged with the version read before the query, so a change committed
+        # in between leaves this entry stale instead of wrongly fresh
+        cache.put(user_id, snapshot(user), version)
+    return user
+
+def invalidate_user(user_id):
+    """Drop cached copies of a user in every process"""
+    if not current_app.config['REDIS_URL']:
+        return
+    
+    get_kv_store().set(user_version_key(user_id), uuid.uuid4().hex, current_app.config['USER_CACHE_TTL_SECONDS'])
+    get_user_cache().discard(user_id)
+
+# Any flushed change to a User invalidates its cache entries once committed
+@event.listens_for(Session, 'after_flush')
+def collect_changed_users(session, flush_context):
+    changed = [obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)]
+    if changed:
+        session.info.setdefault('changed_user_ids', set()).update(changed)
+
+@event.listens_for(Session, 'after_commit')
+def invalidate_changed_users(session):
+    if session.in_nested_transaction():
+        return
+    
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_user(user_id)
+
+@event.listens_for(Session, 'after_transaction_end')
+def discard_changed_users(session, transaction):
+    # Savepoint rollbacks keep the outer transaction's queue
+    if transaction.parent is None:
+        session.info.pop('changed_user_ids', None)
@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+import pytest
+
+# The app module builds its app at import time from the environment
+DATABASE_DIR = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(DATABASE_DIR, 'test.db')}"
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import app as flask_app, db
+from backend.models.user import User
+
+@pytest.fixture
+def app():
+    saved_config = dict(flask_app.config)
+    flask_app.config.update(
+        TESTING=True,
+        BCRYPT_LOG_ROUNDS=4,
+        RATE_LIMIT_ENABLED=False,
+        UPLOAD_FOLDER=tempfile.mkdtemp()
+    )
+    
+    with flask_app.app_context():
+        # Enforce foreign keys like Postgres does
+        @event.listens_for(db.engine, 'connect')
+        def enable_foreign_keys(connection, _record):
+            connection.execute('PRAGMA foreign_keys=ON')
+        db.engine.dispose()
+        
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+        event.remove(db.engine, 'connect', enable_foreign_keys)
+        db.engine.dispose()
+    
+    flask_app.config.clear()
+    flask_app.config.update(saved_config)
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    def make_user(phone_number, name=None, **fields):
+        user = User(phone_number=phone_number, name=name or f"User {phone_number}", **fields)
+        user.set_password('password')
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+def auth_headers(user):
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
@@ -0,0 +1,54 @@
+from app import db
+from backend.models.schedule import Schedule
+from backend.services.resume_service import index_resume
+from backend.services.skill_service import set_user_skills
+from tests.conftest import auth_headers
+
+PRIVATE = {'profile_visibility': 'private', 'contact_info_visibility': 'private'}
+
+def add_schedule(user, day_of_week=0, start_time='09:00', end_time='17:00'):
+    schedule = Schedule(user_id=user.id, day_of_week=day_of_week)
+    schedule.set_hours(start_time, end_time)
+    db.session.add(schedule)
+    db.session.commit()
+
+def test_available_hides_private_profiles_and_contact_details(client, make_user):
+    viewer = make_user('200')
+    public = make_user('201', email='public@example.com', skills='Python,SQL')
+    hidden = make_user('202', email='hidden@example.com', privacy_settings=PRIVATE)
+    add_schedule(public)
+    add_schedule(hidden)
+    
+    response = client.get('/candidates/available?day=0&start=10:00&end=12:00', headers=auth_headers(viewer))
+    
+    assert response.json['total'] == 1
+    [listed] = response.json['users']
+    assert listed['id'] == public.id
+    assert listed['skills'] == ['Python', 'SQL']
+    assert listed['schedule']['start_time'] == '09:00'
+    assert 'phone_number' not in listed and 'email' not in listed
+
+def test_by_skills_hides_private_profiles_and_contact_details(client, make_user):
+    viewer = make_user('210')
+    public = make_user('211', email='public@example.com')
+    hidden = make_user('212', email='hidden@example.com', privacy_settings=PRIVATE)
+    for user in (public, hidden):
+        user.skills = 'Python'
+        set_user_skills(user, user.skills)
+    db.session.commit()
+    
+    response = client.get('/candidates/by-skills?skills=python', headers=auth_headers(viewer))
+    
+    assert response.json['total'] == 1
+    assert response.json['users'] == [{'id': public.id, 'name': public.name, 'skills': ['Python']}]
+
+def test_search_omits_contact_details(client, make_user):
+    viewer = make_user('220')
+    candidate = make_user('221', email='candidate@example.com')
+    index_resume(candidate.id, 'resume.pdf', 'Senior Python developer', {'python'})
+    db.session.commit()
+    
+    response = client.get('/candidates/search?q=python', headers=auth_headers(viewer))
+    
+    assert response.json['total'] == 1
+    assert response.json['candidates'][0]['user'] == {'id': candidate.id, 'name': candidate.name, 'skills': []}
@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+
+from app import db
+from backend.models.credential import Credential, CredentialReminder
+from backend.models.notification import Notification, NotificationCounter
+from backend.services import notification_service
+from backend.services.credential_service import remind_expiring_credentials
+
+def test_reminders_go_through_the_notification_service(app, make_user, monkeypatch):
+    pushes = []
+    monkeypatch.setattr(notification_service, 'emit_to_rooms',
+                        lambda event, data, rooms: pushes.append((event, rooms)))
+    
+    subscribed = make_user('400')
+    opted_out = make_user('401')
+    opted_out.set_notification_preferences({'credential_reminders': False})
+    now = datetime.utcnow()
+    for user in (subscribed, opted_out):
+        db.session.add(Credential(user_id=user.id, title='Licence', expiry_date=now + timedelta(days=3)))
+    db.session.commit()
+    
+    assert remind_expiring_credentials(now=now) == {7: 1, 30: 0}
+    
+    assert CredentialReminder.query.count() == 2
+    assert [n.user_id for n in Notification.query.all()] == [subscribed.id]
+    assert NotificationCounter.query.get(subscribed.id).unread == 1
+    assert pushes == [('notification', [f"user_{subscribed.id}"])]
+    
+    # A rerun sends nothing twice
+    assert remind_expiring_credentials(now=now) == {7: 0, 30: 0}
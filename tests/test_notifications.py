@@ -0,0 +1,32 @@
+from app import db
+from backend.models.notification import Notification
+from backend.services.notification_service import notification_preference, send_notification
+from tests.conftest import auth_headers
+
+def test_notification_types_map_to_their_own_preferences(app):
+    assert notification_preference('message') == 'message_notifications'
+    assert notification_preference('credential_expiry') == 'credential_reminders'
+    assert notification_preference('payment') is None
+
+def test_credential_reminder_preference_is_independent(app, make_user):
+    user = make_user('500')
+    user.set_notification_preferences({'application_updates': False})
+    db.session.commit()
+    
+    assert send_notification(user.id, 'Credential Expiring', 'Soon', 'credential_expiry', 1) is not None
+    
+    user.set_notification_preferences({'credential_reminders': False})
+    db.session.commit()
+    
+    assert send_notification(user.id, 'Credential Expiring', 'Soon', 'credential_expiry', 2) is None
+    assert send_notification(user.id, 'New Message', 'Hi', 'message', 3) is not None
+    db.session.commit()
+    assert Notification.query.count() == 2
+
+def test_preferences_saved_before_a_key_was_added_default_to_on(client, make_user):
+    user = make_user('501', notification_preferences={'job_alerts': False})
+    
+    preferences = client.get('/settings/notifications', headers=auth_headers(user)).json['preferences']
+    
+    assert preferences['job_alerts'] is False
+    assert preferences['credential_reminders'] is True
@@ -0,0 +1,23 @@
+from datetime import datetime, timedelta
+
+from app import db
+from backend.models.notification import Notification, NotificationCounter
+from backend.services.retention_service import purge_notifications
+
+def test_purge_backfills_missing_counter_before_deleting(app, make_user):
+    user = make_user('100')
+    old = datetime.utcnow() - timedelta(days=400)
+    db.session.add_all([
+        Notification(user_id=user.id, title='t', message='m', notification_type='x', created_at=old),
+        Notification(user_id=user.id, title='t', message='m', notification_type='x', created_at=old,
+                     read_at=old),
+        Notification(user_id=user.id, title='t', message='m', notification_type='x')
+    ])
+    db.session.commit()
+    assert NotificationCounter.query.get(user.id) is None
+    
+    purge_notifications(pause=0)
+    
+    counter = NotificationCounter.query.get(user.id)
+    assert Notification.query.filter_by(user_id=user.id).count() == 1
+    assert (counter.total, counter.unread) == (1, 1)
@@ -0,0 +1,44 @@
+import io
+
+from app import db
+from backend.models.candidate import CandidateSearch, ResumeSkill
+from backend.models.credential import Credential
+from backend.models.stored_file import StoredFile
+from backend.models.user import User
+from backend.services.resume_service import index_resume
+from backend.services.storage_service import (
+    save_upload, collect_upload_garbage, RESUMES, CREDENTIALS, PROFILE_IMAGES
+)
+from tests.conftest import auth_headers
+
+def delete_account(client, user):
+    return client.delete('/settings/account/delete', headers=auth_headers(user),
+                         json={'password': 'password', 'confirmation': 'DELETE'})
+
+def test_delete_account_with_indexed_resume(client, make_user):
+    user = make_user('300')
+    user_id = user.id
+    index_resume(user_id, 'resume.pdf', 'Python developer', {'python'})
+    db.session.commit()
+    
+    response = delete_account(client, user)
+    
+    assert response.status_code == 200
+    assert db.session.get(User, user_id) is None
+    assert CandidateSearch.query.count() == 0
+    assert ResumeSkill.query.count() == 0
+
+def test_delete_account_releases_uploads(app, client, make_user):
+    user = make_user('301')
+    user.resume_url = save_upload(io.BytesIO(b'resume'), RESUMES, 'pdf')
+    user.profile_image = save_upload(io.BytesIO(b'image'), PROFILE_IMAGES, 'png')
+    credential_file = save_upload(io.BytesIO(b'certificate'), CREDENTIALS, 'pdf')
+    db.session.add(Credential(user_id=user.id, title='Certificate', file_url=credential_file))
+    db.session.commit()
+    
+    assert delete_account(client, user).status_code == 200
+    assert [blob.ref_count for blob in StoredFile.query.all()] == [0, 0, 0]
+    
+    app.config['UPLOAD_GC_GRACE_HOURS'] = 0
+    assert collect_upload_garbage() == 3
+    assert StoredFile.query.count() == 0
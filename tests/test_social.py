@@ -0,0 +1,88 @@
+import json
+import time
+
+import jwt
+import pytest
+import requests
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from backend.services import social_service
+from backend.services.social_service import JWKSCache
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+def jwks(kid='key-1'):
+    key = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(PRIVATE_KEY.public_key()))
+    return {"keys": [{**key, "kid": kid, "alg": "RS256", "use": "sig"}]}
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+        self.headers = {'Cache-Control': 'public, max-age=3600'}
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.body
+
+class FakeSession:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+    
+    def get(self, url, timeout=None):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return FakeResponse(response)
+
+@pytest.fixture
+def session(monkeypatch):
+    def install(*responses):
+        fake = FakeSession(*responses)
+        monkeypatch.setattr(social_service, 'get_http_session', lambda: fake)
+        return fake
+    return install
+
+def test_malformed_jwks_is_rejected_and_backed_off(app, session):
+    fake = session({"unexpected": []}, jwks())
+    cache = JWKSCache('https://example.com/certs', timeout=1)
+    
+    assert cache.get_key('key-1') is None
+    assert cache.get_key('key-1') is None
+    assert fake.calls == 1
+    
+    cache.retry_at = 0
+    assert cache.get_key('key-1') is not None
+
+def test_keys_without_kid_are_skipped(app, session):
+    document = jwks()
+    document['keys'].append({"kty": "RSA"})
+    session(document)
+    
+    assert JWKSCache('https://example.com/certs', timeout=1).get_key('key-1') is not None
+
+def test_failed_refresh_keeps_the_old_keys(app, session):
+    fake = session(jwks(), requests.ConnectionError('down'))
+    cache = JWKSCache('https://example.com/certs', timeout=1)
+    assert cache.get_key('key-1') is not None
+    
+    cache.expires_at = 0
+    assert cache.get_key('key-1') is not None
+    assert cache.get_key('key-1') is not None
+    assert fake.calls == 2
+    assert cache.retry_at > time.monotonic()
+
+def test_google_login_with_malformed_jwks_is_unauthorized(app, client, session):
+    session({"keys": [{"kty": "RSA"}]})
+    app.config.update(GOOGLE_CLIENT_ID='client-id', GOOGLE_JWKS=None)
+    app.extensions.pop('google_jwks', None)
+    token = jwt.encode({"sub": "1", "aud": "client-id", "iss": "accounts.google.com"}, PRIVATE_KEY,
+                       algorithm='RS256', headers={"kid": "key-1"})
+    
+    response = client.post('/login/google', json={"google_token": token})
+    
+    app.extensions.pop('google_jwks', None)
+    assert response.status_code == 401
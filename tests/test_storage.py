@@ -0,0 +1,26 @@
+import io
+import os
+
+from app import db
+from backend.models.stored_file import StoredFile
+from backend.services.storage_service import (
+    get_storage, save_upload, collect_upload_garbage, storage_key, RESUMES
+)
+
+def test_upload_is_written_before_commit(app):
+    filename = save_upload(io.BytesIO(b'resume'), RESUMES, 'pdf')
+    
+    assert os.path.exists(get_storage().path(storage_key(RESUMES, filename)))
+    db.session.commit()
+    assert StoredFile.query.get(storage_key(RESUMES, filename)).ref_count == 1
+
+def test_rolled_back_upload_is_collected(app):
+    filename = save_upload(io.BytesIO(b'resume'), RESUMES, 'pdf')
+    db.session.rollback()
+    
+    key = storage_key(RESUMES, filename)
+    assert StoredFile.query.get(key).ref_count == 0
+    
+    app.config['UPLOAD_GC_GRACE_HOURS'] = 0
+    assert collect_upload_garbage() == 1
+    assert not os.path.exists(get_storage().path(key))